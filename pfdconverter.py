@@ -5,14 +5,38 @@ import sys
 import subprocess
 import importlib.util
 import threading
+import queue
 import re
 import shutil
 import tempfile
 import io
+import copy
+import bisect
+import zipfile
+import zlib
+import hashlib
+import posixpath
+import gzip
+import json
+import logging
+import pickle
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import time
+import sqlite3
+import argparse
+from contextlib import contextmanager
+from concurrent.futures import Future, as_completed
 from pathlib import Path
 from xml.sax.saxutils import escape
 import xml.etree.ElementTree as ET
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
 # ============ AUTOMATIC DEPENDENCY MANAGEMENT ============  
 def install_and_import(package, import_name=None):
     """Automatically install and import a required package"""
@@ -20,58 +44,2423 @@ def install_and_import(package, import_name=None):
         import_name = package
     
     try:
-        spec = importlib.util.find_spec(import_name)
-        if spec is None:
-            raise ImportError(f"Package {package} not found")
-        module = importlib.import_module(import_name)
-        
-        if package == 'Pillow':
-            from PIL import Image, ImageTk
-            return (Image, ImageTk)
-        
-        return module
-    except ImportError:
-        print(f"Installing {package}...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--quiet", package])
-        print(f"{package} installed successfully!")
+        spec = importlib.util.find_spec(import_name)
+        if spec is None:
+            raise ImportError(f"Package {package} not found")
+        module = importlib.import_module(import_name)
+        
+        if package == 'Pillow':
+            from PIL import Image, ImageTk
+            return (Image, ImageTk)
+        
+        return module
+    except ImportError:
+        print(f"Installing {package}...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "--quiet", package])
+        print(f"{package} installed successfully!")
+        
+        if package == 'Pillow':
+            from PIL import Image, ImageTk
+            return (Image, ImageTk)
+        else:
+            return importlib.import_module(import_name)
+
+# Install and import all required packages
+PIL_Image, PIL_ImageTk = install_and_import('Pillow', 'PIL') 
+Image = PIL_Image
+ImageTk = PIL_ImageTk
+from PIL import ImageDraw
+
+fitz = install_and_import('PyMuPDF', 'fitz')
+
+python_docx = install_and_import('python-docx', 'docx')
+Document = python_docx.Document
+from docx.shared import Pt, Inches, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+from docx.table import Table as DocxTable
+from docx.text.paragraph import Paragraph as DocxParagraph
+from docx.section import Section
+from docx.enum.section import WD_ORIENT, WD_SECTION
+
+reportlab = install_and_import('reportlab')
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether, PageBreak, Table, TableStyle
+from reportlab.lib import colors
+from reportlab.lib.utils import simpleSplit
+from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+pdf2docx_module = install_and_import('pdf2docx', 'pdf2docx')
+Converter = pdf2docx_module.Converter
+
+# ============ CONVERSION ENGINE ============ 
+
+# Inputs larger than this are rejected before any work is scheduled
+MAX_INPUT_BYTES = 500 * 1024 * 1024
+
+# Rough single-core cost used to estimate a job before it runs
+SECONDS_PER_PDF_PAGE = {'fast': 0.01, 'layout': 0.4, 'passthrough': 0.05}
+SECONDS_PER_DOCX_PARAGRAPH = 0.002
+SECONDS_PER_TABLE_CELL = 0.0002
+
+# Parallel DOCX builds only pay off once a job is expected to take this long
+PARALLEL_MIN_SECONDS = 3
+
+# Text width of the letter-size page laid out by build_pdf (1 inch margins)
+CONTENT_WIDTH = letter[0] - 2 * 72
+
+# Long tables are emitted as several ReportLab tables of this many rows, which
+# keeps page splitting linear instead of re-measuring the whole table per page
+TABLE_CHUNK_ROWS = 100
+TABLE_FONT_SIZE = 10
+TABLE_CELL_PADDING = 3
+
+# Joins a table's run texts so they are cleaned and escaped in a single pass
+TEXT_SEPARATOR = '\ue000'
+
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+# Resolution used when an image-only page has to be rendered rather than copied
+PASSTHROUGH_RENDER_DPI = 150
+
+# DOCX output optimizer: images are only resampled when this much larger than
+# needed at the profile's image_dpi, and re-encoded JPEGs use this quality
+EMU_PER_INCH = 914400
+IMAGE_DOWNSAMPLE_THRESHOLD = 0.9
+OPTIMIZED_JPEG_QUALITY = 85
+
+# Named speed/fidelity trade-offs. Knobs:
+#   pdf_engine       PDF to Word engine ('auto', 'fast' or 'layout')
+#   table_detection  let pdf2docx look for lattice and stream tables
+#   preview_dpi      cap on preview rendering resolution (None = fit the preview width)
+#   image_dpi        target DPI for images in Word output, both passthrough pages and
+#                    images downsampled by the DOCX optimizer (None = keep original)
+#   embed_fonts      build PDFs with an embedded TrueType font instead of base-14 Helvetica
+#   parallel         build Word to PDF sections in the worker pool
+CONVERSION_PROFILES = {
+    'draft': {
+        'pdf_engine': 'fast',
+        'table_detection': False,
+        'preview_dpi': 72,
+        'image_dpi': 96,
+        'embed_fonts': False,
+        'parallel': True
+    },
+    'balanced': {
+        'pdf_engine': 'auto',
+        'table_detection': True,
+        'preview_dpi': 110,
+        'image_dpi': 150,
+        'embed_fonts': False,
+        'parallel': True
+    },
+    'high-fidelity': {
+        'pdf_engine': 'layout',
+        'table_detection': True,
+        'preview_dpi': None,
+        'image_dpi': None,
+        'embed_fonts': True,
+        'parallel': False
+    }
+}
+DEFAULT_PROFILE = 'balanced'
+
+# TrueType families tried, in order, when a profile embeds fonts
+EMBEDDABLE_FONTS = [
+    ('DejaVuSans', ('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf', 'DejaVuSans-Oblique.ttf', 'DejaVuSans-BoldOblique.ttf')),
+    ('LiberationSans', ('LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf', 'LiberationSans-Italic.ttf', 'LiberationSans-BoldItalic.ttf')),
+    ('Arial', ('arial.ttf', 'arialbd.ttf', 'ariali.ttf', 'arialbi.ttf'))
+]
+FONT_DIRS = [
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts/Supplemental',
+    os.path.expanduser('~/.fonts')
+]
+_EMBEDDED_FONT = None
+
+
+def get_embedded_font():
+    """Register the first installed TrueType family from EMBEDDABLE_FONTS; None if there is none"""
+    global _EMBEDDED_FONT
+    if _EMBEDDED_FONT is not None:
+        return _EMBEDDED_FONT or None
+    
+    installed = {}
+    for font_dir in FONT_DIRS:
+        for root, _, files in os.walk(font_dir):
+            for name in files:
+                installed.setdefault(name.lower(), os.path.join(root, name))
+    
+    _EMBEDDED_FONT = ''
+    for family, files in EMBEDDABLE_FONTS:
+        paths = [installed.get(name.lower()) for name in files]
+        if not all(paths):
+            continue
+        try:
+            names = [family, f'{family}-Bold', f'{family}-Italic', f'{family}-BoldItalic']
+            for name, path in zip(names, paths):
+                pdfmetrics.registerFont(TTFont(name, path))
+            pdfmetrics.registerFontFamily(family, normal=names[0], bold=names[1], italic=names[2], boldItalic=names[3])
+        except Exception:
+            continue
+        _EMBEDDED_FONT = family
+        break
+    return _EMBEDDED_FONT or None
+
+
+class PreflightError(Exception):
+    """Input rejected by the preflight check; the message is shown to the user"""
+
+
+class DocumentConverter:
+    """Conversion logic shared by the GUI and worker processes (no Tk state)"""
+    
+    def __init__(self, profile=DEFAULT_PROFILE):
+        # PDF to Word engine: 'auto' routes simple text documents to the
+        # fast extractor, 'fast' or 'layout' force one engine
+        self.pdf_engine = 'auto'
+        # Extra keyword arguments for pdf2docx's Converter.convert
+        self.pdf2docx_options = {}
+        # Image-only (scanned) pages skip layout analysis and are placed as pictures;
+        # None keeps the embedded scan, a number downsamples pages to that DPI
+        self.passthrough_dpi = None
+        # Word output: images larger than needed at this DPI are downsampled, None only dedupes
+        self.image_dpi = None
+        # Savings of the last optimize_docx run
+        self.size_report = None
+        # Preview rendering cap in DPI, None fits the preview width
+        self.preview_dpi = None
+        # Word to PDF: embed a TrueType font instead of base-14 Helvetica
+        self.embed_fonts = False
+        # Word to PDF: build sections separated by page/section breaks in a process pool
+        self.parallel_build = False
+        # Word to PDF paragraph styles, shared by every paragraph/cell with the same formatting
+        self.style_cache = {}
+        self.worker_pool = None
+        self.worker_pool_lock = threading.Lock()
+        # Called from the converting thread as progress_callback(stage, done, total),
+        # stage is 'parse' (pages parsed) or 'layout' (pages laid out)
+        self.progress_callback = None
+        
+        self.apply_profile(profile)
+    
+    def apply_profile(self, name):
+        """Apply a named entry of CONVERSION_PROFILES to the conversion settings"""
+        if name not in CONVERSION_PROFILES:
+            raise ValueError(f"Unknown profile '{name}', choose from: {', '.join(CONVERSION_PROFILES)}")
+        
+        profile = CONVERSION_PROFILES[name]
+        self.profile = name
+        self.pdf_engine = profile['pdf_engine']
+        self.pdf2docx_options = {
+            'parse_lattice_table': profile['table_detection'],
+            'parse_stream_table': profile['table_detection']
+        }
+        self.preview_dpi = profile['preview_dpi']
+        self.passthrough_dpi = profile['image_dpi']
+        self.image_dpi = profile['image_dpi']
+        self.embed_fonts = profile['embed_fonts']
+        self.parallel_build = profile['parallel']
+    
+    def report_progress(self, stage, done, total):
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
+    
+    def convert_file(self, source_path, output_path, mode, preflight=None):
+        """Convert source_path ('pdf' or 'docx' mode) to output_path, return the engine used"""
+        if mode == 'pdf':
+            return self.convert_pdf_to_docx(source_path, output_path, preflight)
+        return self.convert_docx_to_pdf_preserve_formatting(source_path, output_path, preflight)
+    
+    def preflight(self, path, mode):
+        """Cheap input inspection before conversion; returns metadata or raises PreflightError"""
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            raise PreflightError(f'The file cannot be read: {e}')
+        if size == 0:
+            raise PreflightError('The file is empty.')
+        if size > MAX_INPUT_BYTES:
+            raise PreflightError(f'The file is larger than {MAX_INPUT_BYTES // (1024 * 1024)} MB.')
+        
+        if mode == 'pdf':
+            meta = self.preflight_pdf(path)
+        else:
+            meta = self.preflight_docx(path)
+        meta['size'] = size
+        return meta
+    
+    def preflight_pdf(self, path, sample_pages=8):
+        """Check that a PDF opens, is not password protected and has pages; sample text vs image content"""
+        try:
+            pdf = fitz.open(path)
+        except Exception:
+            raise PreflightError('The file is not a valid PDF or is damaged.')
+        
+        try:
+            if pdf.needs_pass:
+                raise PreflightError('The PDF is password protected.')
+            page_count = pdf.page_count
+            if page_count == 0:
+                raise PreflightError('The PDF has no pages.')
+            
+            # Sample pages spread evenly through the document
+            step = max(1, page_count // sample_pages)
+            sampled = list(range(0, page_count, step))[:sample_pages]
+            text_pages = 0
+            image_pages = 0
+            for page_num in sampled:
+                page = pdf[page_num]
+                has_text = bool(page.get_text("text").strip())
+                page_area = abs(page.rect) or 1
+                image_area = sum(abs(fitz.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+                text_pages += has_text
+                if not has_text and image_area / page_area > 0.5:
+                    image_pages += 1
+        except PreflightError:
+            raise
+        except Exception:
+            raise PreflightError('The PDF is damaged and its pages cannot be read.')
+        finally:
+            pdf.close()
+        
+        meta = {
+            'page_count': page_count,
+            'sampled_pages': len(sampled),
+            'text_ratio': text_pages / len(sampled),
+        }
+        engine = self.pdf_engine
+        if engine == 'auto':
+            # Estimate with the engine the conversion will pick; a sample without a text layer needs layout
+            engine = self.classify_pdf(path) if text_pages else 'layout'
+            meta['auto_engine'] = engine
+        
+        image_ratio = image_pages / len(sampled)
+        # Image-only pages bypass layout analysis
+        per_page = (1 - image_ratio) * SECONDS_PER_PDF_PAGE[engine] + image_ratio * SECONDS_PER_PDF_PAGE['passthrough']
+        meta['image_ratio'] = image_ratio
+        meta['estimated_seconds'] = page_count * per_page
+        return meta
+    
+    def preflight_docx(self, path):
+        """Check DOCX zip integrity and required parts; count paragraphs and breaks"""
+        if not zipfile.is_zipfile(path):
+            raise PreflightError('The file is not a valid Word document.')
+        
+        try:
+            with zipfile.ZipFile(path) as package:
+                names = set(package.namelist())
+                if '[Content_Types].xml' not in names or 'word/document.xml' not in names:
+                    raise PreflightError('The file is not a Word document (missing document parts).')
+                
+                # CRC-check the XML parts only; media is large and not needed to fail fast
+                for info in package.infolist():
+                    if info.filename.endswith(('.xml', '.rels')):
+                        package.read(info.filename)
+                document_xml = package.read('word/document.xml')
+        except PreflightError:
+            raise
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, EOFError, zlib.error) as e:
+            raise PreflightError(f'The Word document is damaged: {e}')
+        
+        # Paragraphs inside tables are costed per cell, so only the others count as paragraphs
+        paragraph_tag, table_tag, cell_tag = qn('w:p'), qn('w:tbl'), qn('w:tc')
+        paragraphs = tables = cells = 0
+        table_depth = 0
+        try:
+            for event, element in ET.iterparse(io.BytesIO(document_xml), events=('start', 'end')):
+                if element.tag == table_tag:
+                    table_depth += 1 if event == 'start' else -1
+                    tables += event == 'start'
+                elif event == 'start' and element.tag == cell_tag:
+                    cells += 1
+                elif event == 'start' and element.tag == paragraph_tag and not table_depth:
+                    paragraphs += 1
+        except ET.ParseError as e:
+            raise PreflightError(f'The Word document is damaged: {e}')
+        
+        return {
+            'paragraphs': paragraphs,
+            'tables': tables,
+            'table_cells': cells,
+            'page_breaks': document_xml.count(b'w:type="page"') + document_xml.count(b'<w:sectPr'),
+            'estimated_seconds': paragraphs * SECONDS_PER_DOCX_PARAGRAPH + cells * SECONDS_PER_TABLE_CELL
+        }
+    
+    def build_text_index(self, artifact_path):
+        """Index the words of a converted PDF or DOCX and store the index next to it"""
+        if artifact_path.lower().endswith('.pdf'):
+            index = TextIndex('pdf')
+            with fitz.open(artifact_path) as pdf:
+                for page_num in range(len(pdf)):
+                    for x0, y0, x1, y1, word, *_ in pdf[page_num].get_text("words"):
+                        for match in WORD_PATTERN.finditer(word):
+                            index.add(match.group(), page_num, x0, y0, x1, y1)
+        else:
+            # Offsets match the cleaned paragraph text shown by the DOCX preview
+            index = TextIndex('docx')
+            for para_num, paragraph in enumerate(Document(artifact_path).paragraphs):
+                text = self.clean_text(paragraph.text)
+                for match in WORD_PATTERN.finditer(text):
+                    index.add(match.group(), para_num, match.start(), 0, match.end(), 0)
+        
+        index.save(index_path_for(artifact_path))
+        return index
+    
+    def convert_pdf_to_docx(self, pdf_path, docx_path, preflight=None):
+        """Convert PDF to Word using the engine selected by self.pdf_engine, return the engine used"""
+        engine = self.pdf_engine
+        if engine == 'auto':
+            # Preflight classifies the document when it runs under an 'auto' profile
+            engine = (preflight or {}).get('auto_engine') or self.classify_pdf(pdf_path)
+        
+        if engine == 'fast':
+            self.convert_pdf_to_docx_fast(pdf_path, docx_path)
+            self.optimize_docx(docx_path)
+            return engine
+        
+        # Only pages with a text layer go through pdf2docx's layout analysis
+        with fitz.open(pdf_path) as pdf:
+            image_pages = self.find_image_only_pages(pdf)
+            image_set = set(image_pages)
+            text_pages = [n for n in range(len(pdf)) if n not in image_set]
+            
+            if text_pages:
+                with self.track_pdf2docx_progress(layout_total=len(pdf)):
+                    cv = Converter(pdf_path)
+                    if image_pages:
+                        cv.convert(docx_path, pages=text_pages, **self.pdf2docx_options)
+                    else:
+                        cv.convert(docx_path, start=0, end=None, **self.pdf2docx_options)
+                    cv.close()
+            
+            if image_pages and not self.add_passthrough_pages(docx_path, pdf, image_pages, text_pages):
+                # Scans could not be put back in page order: lay out every page instead
+                self.convert_pdf_to_docx_layout(pdf_path, docx_path)
+        
+        self.optimize_docx(docx_path)
+        return engine if text_pages else 'passthrough'
+    
+    def convert_pdf_to_docx_layout(self, pdf_path, docx_path):
+        """Convert every page with pdf2docx's layout analysis, scans included"""
+        with self.track_pdf2docx_progress():
+            cv = Converter(pdf_path)
+            try:
+                cv.convert(docx_path, start=0, end=None, **self.pdf2docx_options)
+            finally:
+                cv.close()
+    
+    def find_image_only_pages(self, pdf):
+        """Page numbers without a text layer, which gain nothing from layout analysis"""
+        pages = []
+        for page_num in range(len(pdf)):
+            page = pdf[page_num]
+            # A page without fonts cannot show text; only extract text when it has some
+            if page.get_fonts() and page.get_text("text").strip():
+                continue
+            pages.append(page_num)
+        return pages
+    
+    def get_page_image(self, page):
+        """Image bytes for a passthrough page: the embedded scan when possible, else a rendering"""
+        if self.passthrough_dpi is None and page.rotation == 0 and not page.get_drawings():
+            infos = page.get_image_info(xrefs=True)
+            if len(infos) == 1 and infos[0].get('xref'):
+                a, b, c, d, _, _ = infos[0]['transform']
+                coverage = abs(fitz.Rect(infos[0]['bbox']) & page.rect) / (abs(page.rect) or 1)
+                # Copy the scan only when it is upright and fills the page
+                if coverage > 0.9 and a > 0 and d > 0 and b == 0 and c == 0:
+                    extracted = page.parent.extract_image(infos[0]['xref'])
+                    if extracted and extracted.get('ext') in ('png', 'jpeg', 'jpg', 'bmp', 'gif', 'tiff'):
+                        return extracted['image']
+        
+        pix = page.get_pixmap(dpi=self.passthrough_dpi or PASSTHROUGH_RENDER_DPI, alpha=False)
+        img = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=85)
+        return buffer.getvalue()
+    
+    def add_picture_paragraph(self, doc, image_bytes, width_pt, height_pt, max_width_pt, max_height_pt):
+        """Append a paragraph holding the image scaled to fit the given box, and return it"""
+        scale = min(1, max_width_pt / width_pt, max_height_pt / height_pt)
+        paragraph = doc.add_paragraph()
+        paragraph.paragraph_format.space_before = Pt(0)
+        paragraph.paragraph_format.space_after = Pt(0)
+        paragraph.add_run().add_picture(
+            io.BytesIO(image_bytes),
+            width=Pt(width_pt * scale),
+            height=Pt(height_pt * scale)
+        )
+        return paragraph
+    
+    def add_passthrough_pages(self, docx_path, pdf, image_pages, text_pages):
+        """Place image-only pages into the DOCX as full-page pictures, each in a section sized like the PDF page.
+        
+        Returns False, leaving the file untouched, when the pages of the DOCX cannot be
+        matched to text_pages; the caller then converts the whole PDF instead.
+        """
+        doc = Document(docx_path) if text_pages else Document()
+        body = doc.element.body
+        
+        # pdf2docx ends each section with a sectPr paragraph, and multi-column pages add
+        # continuous/new-column sections: find where each page starts
+        section_starts = []
+        if text_pages:
+            section_start = None
+            for child in body.iterchildren():
+                if child is body.sectPr:
+                    break
+                if section_start is None:
+                    section_start = child
+                sect_pr = child.find(qn('w:pPr') + '/' + qn('w:sectPr')) if child.tag == qn('w:p') else None
+                if sect_pr is not None:
+                    if self.starts_new_page(sect_pr) or not section_starts:
+                        section_starts.append(section_start)
+                    section_start = None
+            # Content after the last section break belongs to the body's final section
+            if section_start is not None and (self.starts_new_page(body.sectPr) or not section_starts):
+                section_starts.append(section_start)
+        if len(section_starts) != len(text_pages):
+            return False
+        
+        last_section_p = None
+        closed_text = not text_pages
+        for done, page_num in enumerate(image_pages, start=1):
+            page = pdf[page_num]
+            width, height = page.rect.width, page.rect.height
+            
+            i = bisect.bisect_right(text_pages, page_num)
+            if i < len(section_starts):
+                before = section_starts[i]
+            else:
+                before = body.sectPr
+                if not closed_text:
+                    # Give the last text page its own section break before appending scans
+                    body.sectPr.addprevious(self.make_section_paragraph(body.sectPr))
+                    closed_text = True
+            
+            # A 2pt slack keeps the picture line from spilling onto an extra page
+            picture = self.add_picture_paragraph(doc, self.get_page_image(page), width, height, width, height - 2)
+            section_p = self.make_section_paragraph(body.sectPr, width, height)
+            before.addprevious(picture._p)
+            before.addprevious(section_p)
+            if before is body.sectPr:
+                last_section_p = section_p
+            
+            # Continue the layout count from the text pages laid out before
+            self.report_progress('layout', len(text_pages) + done, len(text_pages) + len(image_pages))
+        
+        # The document's final section is described by the body sectPr, not a paragraph
+        if last_section_p is not None:
+            sect_pr = last_section_p.find(qn('w:pPr') + '/' + qn('w:sectPr'))
+            body.remove(body.sectPr)
+            body.append(sect_pr)
+            body.remove(last_section_p)
+        
+        doc.save(docx_path)
+        return True
+    
+    def starts_new_page(self, sect_pr):
+        """Whether the section described by sect_pr starts on a new page"""
+        return sect_pr.start_type not in (WD_SECTION.CONTINUOUS, WD_SECTION.NEW_COLUMN)
+    
+    def make_section_paragraph(self, template_sect_pr, width_pt=None, height_pt=None):
+        """Empty paragraph carrying a section break, optionally resized to a borderless page"""
+        sect_pr = copy.deepcopy(template_sect_pr)
+        if width_pt is not None:
+            section = Section(sect_pr, None)
+            section.start_type = WD_SECTION.NEW_PAGE
+            section.orientation = WD_ORIENT.LANDSCAPE if width_pt > height_pt else WD_ORIENT.PORTRAIT
+            section.page_width = Pt(width_pt)
+            section.page_height = Pt(height_pt)
+            section.left_margin = section.right_margin = Pt(0)
+            section.top_margin = section.bottom_margin = Pt(0)
+            section.header_distance = section.footer_distance = Pt(0)
+        
+        p = OxmlElement('w:p')
+        p_pr = OxmlElement('w:pPr')
+        p_pr.append(sect_pr)
+        p.append(p_pr)
+        return p
+    
+    def optimize_docx(self, docx_path):
+        """Shrink a DOCX in place: dedupe media, downsample images to image_dpi, recompress the zip.
+        
+        Parts are streamed from the old package into the new one without extracting
+        anything to disk. Returns the size report, which is also kept in self.size_report.
+        """
+        bytes_before = os.path.getsize(docx_path)
+        tmp_path = docx_path + '.opt'
+        
+        try:
+            with zipfile.ZipFile(docx_path) as source:
+                infos = source.infolist()
+                
+                # Identical media parts are kept once; duplicates point at the first copy
+                first_copy = {}
+                duplicates = {}
+                for info in infos:
+                    if info.filename.startswith('word/media/'):
+                        digest = hashlib.sha256(source.read(info.filename)).hexdigest()
+                        first = first_copy.setdefault(digest, info.filename)
+                        if first != info.filename:
+                            duplicates[info.filename] = first
+                
+                # Largest displayed size of each image, from the drawings of every part that uses it
+                max_extents = {}
+                rewritten = {}
+                for info in infos:
+                    rels_name = info.filename
+                    if not rels_name.endswith('.rels') or '/_rels/' not in rels_name:
+                        continue
+                    rels_dir, rels_file = rels_name.split('/_rels/')
+                    part_name = posixpath.join(rels_dir, rels_file[:-len('.rels')])
+                    rels_xml = source.read(rels_name)
+                    
+                    targets = {}
+                    for rel in ET.fromstring(rels_xml):
+                        if rel.get('TargetMode') != 'External' and rel.get('Target'):
+                            targets[rel.get('Id')] = posixpath.normpath(posixpath.join(rels_dir, rel.get('Target'))).lstrip('/')
+                    
+                    if duplicates and any(target in duplicates for target in targets.values()):
+                        def retarget(match, rels_dir=rels_dir):
+                            target = posixpath.normpath(posixpath.join(rels_dir, match.group(1).decode())).lstrip('/')
+                            if target not in duplicates:
+                                return match.group(0)
+                            return b'Target="' + posixpath.relpath(duplicates[target], rels_dir).encode() + b'"'
+                        rewritten[rels_name] = re.sub(rb'Target="([^"]*)"', retarget, rels_xml)
+                    
+                    if self.image_dpi and part_name.endswith('.xml') and any(t.startswith('word/media/') for t in targets.values()):
+                        part = ET.fromstring(source.read(part_name))
+                        for drawing in itertools.chain(part.iter(qn('wp:inline')), part.iter(qn('wp:anchor'))):
+                            extent = drawing.find(qn('wp:extent'))
+                            if extent is None:
+                                continue
+                            width = int(extent.get('cx', 0)) * self.image_dpi / EMU_PER_INCH
+                            height = int(extent.get('cy', 0)) * self.image_dpi / EMU_PER_INCH
+                            for blip in drawing.iter(qn('a:blip')):
+                                target = targets.get(blip.get(qn('r:embed')))
+                                if target is None:
+                                    continue
+                                target = duplicates.get(target, target)
+                                known = max_extents.get(target, (0, 0))
+                                max_extents[target] = (max(known[0], width), max(known[1], height))
+                
+                # Overrides naming a dropped duplicate must go too
+                if duplicates:
+                    content_types = source.read('[Content_Types].xml')
+                    for name in duplicates:
+                        content_types = re.sub(rb'<Override PartName="/' + re.escape(name.encode()) + rb'"[^>]*/>', b'', content_types)
+                    rewritten['[Content_Types].xml'] = content_types
+                
+                # Downsample in the worker pool when there is more than one image to do
+                jobs = [(name, w, h) for name, (w, h) in max_extents.items() if w >= 1 and h >= 1]
+                if self.parallel_build and len(jobs) > 1 and (os.cpu_count() or 1) > 1:
+                    pool = self.get_worker_pool()
+                    pending = [(name, pool.submit(recompress_image, source.read(name), w, h)) for name, w, h in jobs]
+                    recompressed = {name: future.result() for name, future in pending}
+                else:
+                    recompressed = {name: recompress_image(source.read(name), w, h) for name, w, h in jobs}
+                recompressed = {name: data for name, data in recompressed.items() if data is not None}
+                
+                with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as target:
+                    for info in infos:
+                        name = info.filename
+                        if name in duplicates:
+                            continue
+                        if name in recompressed:
+                            data = recompressed[name]
+                        elif name in rewritten:
+                            data = rewritten[name]
+                        else:
+                            data = source.read(name)
+                        target.writestr(name, data)
+            
+            # Keep the original when rewriting did not help (already optimized output)
+            if os.path.getsize(tmp_path) < bytes_before:
+                os.replace(tmp_path, docx_path)
+        finally:
+            # Drop a rewrite that was not smaller, or one left half-written by an error
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        self.size_report = {
+            'bytes_before': bytes_before,
+            'bytes_after': os.path.getsize(docx_path),
+            'duplicates_removed': len(duplicates),
+            'images_downsampled': len(recompressed)
+        }
+        return self.size_report
+    
+    @contextmanager
+    def track_pdf2docx_progress(self, layout_total=None):
+        """Forward pdf2docx's per-page log messages from this thread to report_progress.
+        
+        layout_total replaces pdf2docx's page count for the layout stage when more
+        pages (passthrough scans) are laid out after it.
+        """
+        if self.progress_callback is None:
+            yield
+            return
+        
+        callback = self.report_progress
+        if layout_total is not None:
+            def callback(stage, done, total):
+                self.report_progress(stage, done, layout_total if stage == 'layout' else total)
+        
+        handler = Pdf2docxProgressHandler(callback)
+        root = logging.getLogger()
+        root.addHandler(handler)
+        try:
+            yield
+        finally:
+            root.removeHandler(handler)
+    
+    def classify_pdf(self, pdf_path, sample_pages=8):
+        """Return 'fast' for plain text documents, 'layout' when full analysis is needed"""
+        try:
+            pdf = fitz.open(pdf_path)
+        except Exception:
+            return 'layout'
+        
+        try:
+            page_count = len(pdf)
+            if page_count == 0:
+                return 'layout'
+            
+            # The side-by-side block test needs text extraction: run it on sampled pages only
+            step = max(1, page_count // sample_pages)
+            sampled = set(range(0, page_count, step)[:sample_pages])
+            found_text = False
+            for page_num in range(page_count):
+                page = pdf[page_num]
+                
+                # Images and vector drawings (table rules, charts) would be dropped by the
+                # fast path, so every page is checked for them
+                has_graphics = bool(page.get_images(full=False)) or len(page.get_drawings()) > 10
+                if not has_graphics and page_num not in sampled:
+                    continue
+                
+                # Pages without text are placed as pictures and do not need layout analysis
+                text_blocks = [b for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+                if not text_blocks:
+                    continue
+                found_text = True
+                
+                # Graphics next to text need layout analysis
+                if has_graphics:
+                    return 'layout'
+                
+                # Blocks side by side on the same line mean columns or tables
+                for i, a in enumerate(text_blocks):
+                    for b in text_blocks[i + 1:]:
+                        same_band = a[1] < b[3] and b[1] < a[3]
+                        side_by_side = a[2] <= b[0] or b[2] <= a[0]
+                        if same_band and side_by_side:
+                            return 'layout'
+            
+            return 'fast' if found_text else 'layout'
+        finally:
+            pdf.close()
+    
+    def convert_pdf_to_docx_fast(self, pdf_path, docx_path):
+        """Convert a text-only PDF to Word from fitz text spans, skipping layout analysis"""
+        pdf = fitz.open(pdf_path)
+        doc = Document()
+        
+        try:
+            page_count = len(pdf)
+            image_pages = set(self.find_image_only_pages(pdf))
+            section = doc.sections[0]
+            usable_width = section.page_width.pt - section.left_margin.pt - section.right_margin.pt
+            usable_height = section.page_height.pt - section.top_margin.pt - section.bottom_margin.pt
+            
+            for page_num in range(page_count):
+                page = pdf[page_num]
+                if page_num > 0:
+                    doc.add_page_break()
+                self.report_progress('parse', page_num + 1, page_count)
+                
+                if page_num in image_pages:
+                    # Scanned page: place the page image, scaled to the text area
+                    if page.get_images(full=False) or page.get_drawings():
+                        self.add_picture_paragraph(
+                            doc, self.get_page_image(page),
+                            page.rect.width, page.rect.height,
+                            usable_width, usable_height - 2
+                        )
+                    self.report_progress('layout', page_num + 1, page_count)
+                    continue
+                
+                for block in page.get_text("dict")["blocks"]:
+                    # Only text blocks (type 0) are written
+                    if block.get("type") != 0:
+                        continue
+                    
+                    spans = []
+                    for line in block["lines"]:
+                        if spans:
+                            spans.append(None)  # line break inside the block
+                        spans.extend(line["spans"])
+                    
+                    self.add_fast_paragraph(doc, spans)
+                
+                self.report_progress('layout', page_num + 1, page_count)
+        finally:
+            pdf.close()
+        
+        doc.save(docx_path)
+    
+    def add_fast_paragraph(self, doc, spans):
+        """Write one PDF text block as a paragraph, merging spans with equal formatting"""
+        runs = []
+        for span in spans:
+            if span is None:
+                # Join wrapped lines with a space
+                if runs and not runs[-1][0].endswith((' ', '-')):
+                    runs[-1][0] += ' '
+                continue
+            
+            text = self.clean_text(span["text"])
+            if not text:
+                continue
+            
+            font = span["font"].lower()
+            size = round(span["size"] * 2) / 2
+            bold = bool(span["flags"] & 16) or 'bold' in font
+            italic = bool(span["flags"] & 2) or 'italic' in font or 'oblique' in font
+            
+            if runs and runs[-1][1:] == [size, bold, italic]:
+                runs[-1][0] += text
+            else:
+                runs.append([text, size, bold, italic])
+        
+        if not any(text.strip() for text, _, _, _ in runs):
+            return
+        
+        paragraph = doc.add_paragraph()
+        for text, size, bold, italic in runs:
+            run = paragraph.add_run(text)
+            run.font.size = Pt(size)
+            run.bold = bold
+            run.italic = italic
+    
+    def convert_docx_to_pdf_preserve_formatting(self, docx_path, pdf_path, preflight=None):
+        """Convert DOCX to PDF while preserving ALL formatting, spacing, and layout"""
+        doc = Document(docx_path)
+        segments = self.split_docx_segments(doc)
+        
+        # Small documents build faster on one core than through the pool
+        worth_parallel = preflight is None or preflight['estimated_seconds'] >= PARALLEL_MIN_SECONDS
+        if self.parallel_build and worth_parallel and len(segments) > 1 and (os.cpu_count() or 1) > 1:
+            self.build_pdf_parallel(docx_path, len(segments), pdf_path)
+            return 'parallel'
+        
+        # Explicit page and section breaks start a new page
+        story = []
+        for segment in segments:
+            if story:
+                story.append(PageBreak())
+            story.extend(self.build_story(segment))
+        
+        # Build the PDF
+        self.build_pdf(story, pdf_path)
+        return 'sequential'
+    
+    def iter_block_items(self, doc):
+        """Yield the body's paragraphs and tables in document order"""
+        for child in doc.element.body.iterchildren():
+            if child.tag == qn('w:p'):
+                yield DocxParagraph(child, doc)
+            elif child.tag == qn('w:tbl'):
+                yield DocxTable(child, doc)
+    
+    def split_docx_segments(self, doc):
+        """Split the document body into segments at explicit page and section breaks"""
+        segments = [[]]
+        
+        for block in self.iter_block_items(doc):
+            if isinstance(block, DocxTable):
+                segments[-1].append(block)
+                continue
+            
+            paragraph = block
+            # "Page break before" starts a new segment with this paragraph
+            if paragraph.paragraph_format.page_break_before and segments[-1]:
+                segments.append([])
+            
+            segments[-1].append(paragraph)
+            
+            # Manual page breaks and section breaks end the segment after this paragraph
+            p = paragraph._p
+            if p.xpath('./w:r/w:br[@w:type="page"]') or p.xpath('./w:pPr/w:sectPr'):
+                segments.append([])
+        
+        if len(segments) > 1 and not segments[-1]:
+            segments.pop()
+        return segments
+    
+    def build_story(self, blocks):
+        """Build ReportLab flowables for a list of Word paragraphs and tables"""
+        story = []
+        
+        # Process each paragraph individually to preserve spacing
+        for paragraph in blocks:
+            if isinstance(paragraph, DocxTable):
+                story.extend(self.build_table(paragraph._tbl, CONTENT_WIDTH))
+                continue
+            
+            # Get paragraph formatting
+            p_format = paragraph.paragraph_format
+            
+            # Calculate spacing values in points
+            space_before = self.get_paragraph_spacing(p_format.space_before)
+            space_after = self.get_paragraph_spacing(p_format.space_after)
+            line_spacing = self.get_line_spacing(p_format.line_spacing)
+            
+            # Get alignment
+            alignment = self.get_paragraph_alignment(paragraph.alignment)
+            
+            # Get indentation
+            left_indent = self.get_indent(p_format.left_indent)
+            right_indent = self.get_indent(p_format.right_indent)
+            first_line_indent = self.get_indent(p_format.first_line_indent)
+            
+            # Add space before paragraph if needed
+            if space_before > 0:
+                story.append(Spacer(1, space_before))
+            
+            # Process runs to preserve inline formatting
+            if len(paragraph.runs) > 0:
+                # Build formatted text with proper XML tags
+                formatted_text = self.build_formatted_text(paragraph.runs)
+                
+                if formatted_text:
+                    # Create paragraph style with all formatting
+                    p_style = self.get_paragraph_style(
+                        fontName=self.get_body_font(),
+                        fontSize=11,
+                        leading=line_spacing,
+                        alignment=alignment,
+                        leftIndent=left_indent,
+                        rightIndent=right_indent,
+                        firstLineIndent=first_line_indent
+                    )
+                    
+                    # Create paragraph and add to story
+                    p = Paragraph(formatted_text, p_style)
+                    p.outline_level = self.get_outline_level(paragraph)
+                    story.append(p)
+            
+            # Add space after paragraph if needed
+            if space_after > 0:
+                story.append(Spacer(1, space_after))
+        
+        return story
+    
+    def get_paragraph_style(self, **attrs):
+        """ParagraphStyle for the given attributes, created once per distinct combination"""
+        key = tuple(sorted(attrs.items()))
+        style = self.style_cache.get(key)
+        if style is None:
+            style = ParagraphStyle(f'ParaStyle_{len(self.style_cache)}', parent=get_stylesheet()['Normal'], **attrs)
+            self.style_cache[key] = style
+        return style
+    
+    def build_table(self, tbl, available_width):
+        """Convert a Word table, including nested tables, into ReportLab tables.
+        
+        Text cleaning/escaping and style lookup happen once per table rather than
+        once per cell, and cells are read straight from the XML.
+        """
+        rows = tbl.tr_lst
+        if not rows:
+            return []
+        
+        # Pass 1: cell structure and raw run texts
+        texts = []
+        layout = []
+        for tr in rows:
+            row = []
+            col = 0
+            for tc in tr.tc_lst:
+                span = tc.grid_span or 1
+                v_merge = tc.vMerge
+                content = []
+                if v_merge != 'continue':
+                    for child in tc.iterchildren():
+                        if child.tag == qn('w:p'):
+                            runs = []
+                            for r in child.r_lst:
+                                r_pr = r.rPr
+                                if r_pr is None:
+                                    runs.append((len(texts), False, False, False))
+                                else:
+                                    runs.append((
+                                        len(texts),
+                                        bool(r_pr.b is not None and r_pr.b.val),
+                                        bool(r_pr.i is not None and r_pr.i.val),
+                                        bool(r_pr.u_val)
+                                    ))
+                                texts.append(r.text)
+                            jc = child.pPr.jc_val if child.pPr is not None else None
+                            content.append(('p', jc, runs))
+                        elif child.tag == qn('w:tbl'):
+                            content.append(('tbl', child, None))
+                row.append((col, span, v_merge, content))
+                col += span
+            layout.append(row)
+        
+        cleaned, escaped = self.normalize_texts(texts)
+        
+        # Column widths from the table grid, scaled to fit the available width
+        grid = tbl.tblGrid
+        widths = [gc.w.pt if gc.w else 0 for gc in grid.gridCol_lst] if grid is not None else []
+        col_count = max([len(widths)] + [col + span for row in layout for col, span, _, _ in row[-1:]])
+        if len(widths) < col_count or not all(widths):
+            widths = [available_width / col_count] * col_count
+        total = sum(widths)
+        if total > available_width:
+            widths = [w * available_width / total for w in widths]
+        
+        # One style per alignment for the whole table
+        font = self.get_body_font()
+        styles = {}
+        
+        def cell_style(jc):
+            if jc not in styles:
+                styles[jc] = self.get_paragraph_style(
+                    fontName=font,
+                    fontSize=TABLE_FONT_SIZE,
+                    leading=TABLE_FONT_SIZE * 1.2,
+                    alignment=self.get_paragraph_alignment(jc)
+                )
+            return styles[jc]
+        
+        # Pass 2: cell flowables, spans and row chunking
+        data = []
+        spans = []
+        open_merges = {}
+        break_ok = []
+        for r, row in enumerate(layout):
+            cells = [''] * col_count
+            row_break_ok = True
+            for col, span, v_merge, content in row:
+                if col >= col_count:
+                    continue
+                cell_width = sum(widths[col:col + span]) - 2 * TABLE_CELL_PADDING
+                
+                if v_merge == 'continue':
+                    row_break_ok = False
+                    if col in open_merges:
+                        open_merges[col][1] = r
+                    continue
+                # A new restart or a plain cell closes the merge open in this column
+                if col in open_merges:
+                    start, end, merged_span = open_merges.pop(col)
+                    if end > start or merged_span > 1:
+                        spans.append((col, start, col + merged_span - 1, end))
+                if v_merge == 'restart':
+                    open_merges[col] = [r, r, span]
+                elif span > 1:
+                    spans.append((col, r, col + span - 1, r))
+                
+                cells[col] = self.build_cell(content, cleaned, escaped, cell_width, cell_style)
+            data.append(cells)
+            break_ok.append(row_break_ok)
+        for col, (start, end, span) in open_merges.items():
+            if end > start or span > 1:
+                spans.append((col, start, col + span - 1, end))
+        
+        header_rows = 0
+        for tr in rows:
+            if tr.trPr is None or tr.trPr.find(qn('w:tblHeader')) is None:
+                break
+            header_rows += 1
+        header_rows = min(header_rows, len(data) - 1)
+        
+        # Split long tables at rows that are not inside a vertical merge
+        chunks = []
+        start = header_rows
+        for r in range(header_rows + 1, len(data)):
+            if r - start >= TABLE_CHUNK_ROWS and break_ok[r]:
+                chunks.append((start, r))
+                start = r
+        chunks.append((start, len(data)))
+        
+        flowables = []
+        for first, last in chunks:
+            rows_in_chunk = list(range(header_rows)) + list(range(first, last))
+            position = {r: i for i, r in enumerate(rows_in_chunk)}
+            commands = [
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#a1a1a6')),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('FONT', (0, 0), (-1, -1), font, TABLE_FONT_SIZE, TABLE_FONT_SIZE * 1.2),
+                ('LEFTPADDING', (0, 0), (-1, -1), TABLE_CELL_PADDING),
+                ('RIGHTPADDING', (0, 0), (-1, -1), TABLE_CELL_PADDING),
+                ('TOPPADDING', (0, 0), (-1, -1), TABLE_CELL_PADDING),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), TABLE_CELL_PADDING)
+            ]
+            for c0, r0, c1, r1 in spans:
+                if r0 in position and r1 in position:
+                    commands.append(('SPAN', (c0, position[r0]), (c1, position[r1])))
+            
+            table = Table(
+                [data[r] for r in rows_in_chunk],
+                colWidths=widths,
+                repeatRows=header_rows,
+                hAlign='LEFT'
+            )
+            table.setStyle(TableStyle(commands))
+            flowables.append(table)
+        
+        flowables.append(Spacer(1, 6))
+        return flowables
+    
+    def build_cell(self, content, cleaned, escaped, cell_width, cell_style):
+        """Flowables for one table cell; short unformatted text stays a plain string"""
+        if not content:
+            return ''
+        
+        # Fast path: one left-aligned, unformatted paragraph is pre-wrapped into a plain
+        # string, which the table draws line by line without a Paragraph
+        if len(content) == 1 and content[0][0] == 'p' and content[0][1] in (None, WD_ALIGN_PARAGRAPH.LEFT):
+            runs = content[0][2]
+            if not any(b or i or u for _, b, i, u in runs):
+                text = ''.join(cleaned[index] for index, _, _, _ in runs)
+                return '\n'.join(simpleSplit(text, cell_style(None).fontName, TABLE_FONT_SIZE, cell_width))
+        
+        flowables = []
+        for kind, value, runs in content:
+            if kind == 'tbl':
+                flowables.extend(self.build_table(value, cell_width))
+                continue
+            
+            parts = []
+            for index, bold, italic, underline in runs:
+                safe_text = escaped[index]
+                if not safe_text:
+                    continue
+                if bold:
+                    safe_text = f"<b>{safe_text}</b>"
+                if italic:
+                    safe_text = f"<i>{safe_text}</i>"
+                if underline:
+                    safe_text = f"<u>{safe_text}</u>"
+                parts.append(safe_text)
+            if parts:
+                flowables.append(Paragraph(''.join(parts), cell_style(value)))
+        return flowables or ''
+    
+    def normalize_texts(self, texts):
+        """Clean and XML-escape many strings in one pass; returns (cleaned, escaped) lists"""
+        cleaned = self.clean_text(TEXT_SEPARATOR.join(texts)).split(TEXT_SEPARATOR)
+        if len(cleaned) != len(texts):
+            # A text contained the separator itself: fall back to one call per text
+            cleaned = [self.clean_text(text) for text in texts]
+            return cleaned, [self.escape_xml_chars(text) for text in cleaned]
+        escaped = self.escape_xml_chars(TEXT_SEPARATOR.join(cleaned)).split(TEXT_SEPARATOR)
+        return cleaned, escaped
+    
+    def get_body_font(self):
+        """ReportLab font family for body text"""
+        if self.embed_fonts:
+            return get_embedded_font() or 'Helvetica'
+        return 'Helvetica'
+    
+    def build_pdf(self, story, pdf_path):
+        """Lay out a story into a letter-size PDF with proper margins"""
+        doc_template = OutlineDocTemplate(
+            pdf_path,
+            pagesize=letter,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=72
+        )
+        doc_template.total_flowables = len(story)
+        doc_template.progress_callback = self.report_progress
+        doc_template.build(story)
+    
+    def build_pdf_parallel(self, docx_path, segment_count, pdf_path):
+        """Build segments in the warm worker pool and merge them with fitz"""
+        pool = self.get_worker_pool()
+        workers = min(pool.processes, segment_count)
+        
+        # Contiguous batches, one per worker, so each worker parses the DOCX once
+        per_worker, extra = divmod(segment_count, workers)
+        batches = []
+        start = 0
+        for i in range(workers):
+            size = per_worker + (1 if i < extra else 0)
+            batches.append(list(range(start, start + size)))
+            start += size
+        
+        tmp_dir = tempfile.mkdtemp(prefix='docx2pdf_')
+        try:
+            segment_paths = [os.path.join(tmp_dir, f'segment_{i}.pdf') for i in range(len(batches))]
+            futures = {
+                pool.submit(build_pdf_segments, docx_path, batch, path, self.profile): path
+                for batch, path in zip(batches, segment_paths)
+            }
+            
+            # Pages are only known once a batch is built; estimate the total from batches done
+            pages_done = 0
+            for batches_done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                pages_done += count_pages(futures[future]) or 0
+                estimated_total = round(pages_done * len(batches) / batches_done)
+                self.report_progress('layout', pages_done, estimated_total)
+            
+            self.merge_pdf_segments(segment_paths, pdf_path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def get_worker_pool(self):
+        """Start the warm worker pool on first use"""
+        with self.worker_pool_lock:
+            if self.worker_pool is None:
+                self.worker_pool = WarmWorkerPool()
+            return self.worker_pool
+    
+    def shutdown_worker_pool(self):
+        with self.worker_pool_lock:
+            if self.worker_pool is not None:
+                self.worker_pool.shutdown()
+                self.worker_pool = None
+    
+    def merge_pdf_segments(self, segment_paths, pdf_path):
+        """Concatenate segment PDFs, shifting outlines and renumbering pages"""
+        merged = fitz.open()
+        toc = []
+        
+        try:
+            for path in segment_paths:
+                segment = fitz.open(path)
+                offset = merged.page_count
+                merged.insert_pdf(segment)
+                # Outline targets are relative to the segment's first page
+                toc.extend([level, title, page + offset] for level, title, page in segment.get_toc())
+                segment.close()
+            
+            if toc:
+                merged.set_toc(toc)
+            # Continuous page labels across all segments
+            merged.set_page_labels([{'startpage': 0, 'prefix': '', 'style': 'D', 'firstpagenum': 1}])
+            merged.save(pdf_path, garbage=3, deflate=True)
+        finally:
+            merged.close()
+    
+    def get_outline_level(self, paragraph):
+        """Return the outline level for Title/Heading paragraphs, None otherwise"""
+        try:
+            style_name = paragraph.style.name or ''
+        except Exception:
+            return None
+        
+        if style_name == 'Title':
+            return 0
+        match = re.match(r'Heading (\d+)$', style_name)
+        if match:
+            return max(0, int(match.group(1)) - 1)
+        return None
+    
+    def get_paragraph_spacing(self, spacing_value):
+        """Convert Word spacing to points"""
+        if spacing_value is None:
+            return 0
+        try:
+            return spacing_value.pt
+        except:
+            return 0
+    
+    def get_line_spacing(self, line_spacing):
+        """Convert Word line spacing to points"""
+        if line_spacing is None:
+            return 14  # Default line spacing
+        
+        try:
+            if hasattr(line_spacing, 'pt'):
+                return line_spacing.pt
+            else:
+                # If it's a multiple, convert to points (assuming 12pt base)
+                return line_spacing * 12
+        except:
+            return 14
+    
+    def get_indent(self, indent_value):
+        """Convert Word indent to points"""
+        if indent_value is None:
+            return 0
+        try:
+            return indent_value.pt
+        except:
+            return 0
+    
+    def get_paragraph_alignment(self, alignment):
+        """Convert Word alignment to ReportLab alignment"""
+        if alignment is None:
+            return TA_LEFT
+        
+        alignment_map = {
+            WD_ALIGN_PARAGRAPH.LEFT: TA_LEFT,
+            WD_ALIGN_PARAGRAPH.CENTER: TA_CENTER,
+            WD_ALIGN_PARAGRAPH.RIGHT: TA_RIGHT,
+            WD_ALIGN_PARAGRAPH.JUSTIFY: TA_JUSTIFY
+        }
+        return alignment_map.get(alignment, TA_LEFT)
+    
+    def build_formatted_text(self, runs):
+        """Build formatted text from runs with proper XML tags"""
+        formatted_parts = []
+        
+        for run in runs:
+            text = run.text
+            if not text:
+                continue
+            
+            # Clean the text
+            clean_text = self.clean_text(text)
+            if not clean_text:
+                continue
+            
+            # Escape XML characters
+            safe_text = self.escape_xml_chars(clean_text)
+            
+            # Apply formatting tags
+            if run.bold:
+                safe_text = f"<b>{safe_text}</b>"
+            if run.italic:
+                safe_text = f"<i>{safe_text}</i>"
+            if run.underline:
+                safe_text = f"<u>{safe_text}</u>"
+            
+            formatted_parts.append(safe_text)
+        
+        return ''.join(formatted_parts)
+    
+    def escape_xml_chars(self, text):
+        """Escape XML special characters for ReportLab"""
+        if not text:
+            return ""
+        text = text.replace('&', '&amp;')
+        text = text.replace('<', '&lt;')
+        text = text.replace('>', '&gt;')
+        return text
+    
+    def clean_text(self, text):
+        """Clean text while preserving all meaningful characters"""
+        if not text:
+            return ""
+        
+        # Remove control characters, keeping tabs and line breaks
+        return CONTROL_CHARS.sub('', text)
+    
+
+class OutlineDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that turns heading paragraphs into PDF outline entries"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outline_count = 0
+        self.last_outline_level = -1
+        self.flowables_done = 0
+        self.total_flowables = 0
+        self.progress_callback = None
+    
+    def afterPage(self):
+        if self.progress_callback is None or not self.total_flowables:
+            return
+        # Estimate the final page count from the share of the story laid out so far
+        fraction = max(self.flowables_done / self.total_flowables, 1e-6)
+        self.progress_callback('layout', self.page, max(self.page, round(self.page / fraction)))
+    
+    def afterFlowable(self, flowable):
+        self.flowables_done += 1
+        level = getattr(flowable, 'outline_level', None)
+        if level is None:
+            return
+        
+        # ReportLab rejects outlines that skip levels
+        level = min(level, self.last_outline_level + 1)
+        key = f'outline_{self.outline_count}'
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(flowable.getPlainText(), key, level=level)
+        self.outline_count += 1
+        self.last_outline_level = level
+
+
+class Pdf2docxProgressHandler(logging.Handler):
+    """Turns pdf2docx '(i/n) Page p' log records into parse/layout progress reports"""
+    
+    PAGE_PATTERN = re.compile(r'\((\d+)/(\d+)\) Page')
+    
+    def __init__(self, callback):
+        super().__init__(level=logging.INFO)
+        self.callback = callback
+        self.thread_id = threading.get_ident()
+        self.stage = 'parse'
+    
+    def emit(self, record):
+        # The root logger is shared; only follow the converting thread
+        if record.thread != self.thread_id:
+            return
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        
+        if 'Parsing pages' in message:
+            self.stage = 'parse'
+        elif 'Creating pages' in message:
+            self.stage = 'layout'
+        else:
+            match = self.PAGE_PATTERN.search(message)
+            if match:
+                self.callback(self.stage, int(match.group(1)), int(match.group(2)))
+
+
+def build_pdf_segments(docx_path, segment_indices, pdf_path, profile=DEFAULT_PROFILE):
+    """Process pool entry point: build a run of DOCX segments into one PDF"""
+    converter = DocumentConverter(profile)
+    converter.parallel_build = False
+    segments = converter.split_docx_segments(Document(docx_path))
+    
+    story = []
+    for index in segment_indices:
+        if story:
+            story.append(PageBreak())
+        story.extend(converter.build_story(segments[index]))
+    
+    converter.build_pdf(story, pdf_path)
+
+
+def recompress_image(data, max_width, max_height):
+    """Process pool entry point: downsample a JPEG/PNG to fit max_width x max_height pixels.
+    
+    Returns the re-encoded image in its original format, or None when it is already
+    small enough, is another format, or would not get smaller.
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        img_format = img.format
+        if img_format not in ('JPEG', 'PNG'):
+            return None
+        
+        scale = min(max_width / img.width, max_height / img.height)
+        if scale >= IMAGE_DOWNSAMPLE_THRESHOLD:
+            return None
+        
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+        
+        buffer = io.BytesIO()
+        if img_format == 'JPEG':
+            img.save(buffer, 'JPEG', quality=OPTIMIZED_JPEG_QUALITY, optimize=True)
+        else:
+            img.save(buffer, 'PNG', optimize=True)
+    except Exception:
+        return None
+    
+    resized = buffer.getvalue()
+    return resized if len(resized) < len(data) else None
+
+
+def format_size_report(report):
+    """One-line summary of an optimize_docx size report"""
+    before = report['bytes_before']
+    after = report['bytes_after']
+    saved = (before - after) / before * 100 if before else 0
+    return (
+        f"{before / (1024 * 1024):.1f} MB -> {after / (1024 * 1024):.1f} MB ({saved:.0f}% smaller, "
+        f"{report['duplicates_removed']} duplicate image(s) removed, {report['images_downsampled']} downsampled)"
+    )
+
+
+# ============ JOB HISTORY ============ 
+
+APP_DATA_DIR = Path.home() / '.pdfconverter'
+HISTORY_DB = APP_DATA_DIR / 'history.sqlite3'
+
+
+# CPU seconds spent in warm pool workers, keyed by the thread that submitted the job
+POOL_CPU_SECONDS = {}
+
+# How often a running job samples the process RSS
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def get_cpu_seconds():
+    """CPU seconds used by the calling thread and the pool jobs it submitted"""
+    # Pool workers are the only child processes and report CPU per job; RUSAGE_CHILDREN
+    # would count them again, all at once, whenever a recycled worker is joined
+    return time.thread_time() + POOL_CPU_SECONDS.get(threading.get_ident(), 0)
+
+
+def get_peak_rss_bytes():
+    """Peak resident set size of this process and its children, None if unknown"""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def get_current_rss_bytes():
+    """Current resident set size of this process, None if unknown"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    # No /proc (macOS, Windows): use psutil when it happens to be installed
+    if importlib.util.find_spec('psutil') is not None:
+        return importlib.import_module('psutil').Process().memory_info().rss
+    return None
+
+
+class RssSampler:
+    """Background thread keeping the highest process RSS seen while a job runs"""
+    
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample_loop, daemon=True)
+    
+    def sample(self):
+        rss = get_current_rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+    
+    def sample_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+    
+    def start(self):
+        self.sample()
+        self.thread.start()
+    
+    def stop(self):
+        """Stop sampling and return the peak in bytes, None if RSS cannot be read"""
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+        return self.peak
+
+
+def count_pages(path):
+    """Page count of a PDF, None for other files or on error"""
+    if not path or not str(path).lower().endswith('.pdf'):
+        return None
+    try:
+        with fitz.open(path) as pdf:
+            return pdf.page_count
+    except Exception:
+        return None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class JobHistory:
+    """Per-job resource metrics stored in a local SQLite database"""
+    
+    def __init__(self, db_path=HISTORY_DB):
+        self.db_path = Path(db_path)
+        self.lock = threading.Lock()
+    
+    def connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                finished_at REAL NOT NULL,
+                kind TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                engine TEXT,
+                status TEXT NOT NULL,
+                wall_seconds REAL,
+                cpu_seconds REAL,
+                peak_rss_bytes INTEGER,
+                page_count INTEGER,
+                input_bytes INTEGER,
+                output_bytes INTEGER
+            )
+        """)
+        return conn
+    
+    @contextmanager
+    def track(self, kind, mode, input_path):
+        """Measure the enclosed conversion; the caller fills 'output' and 'engine' in the yielded dict"""
+        job = {'output': None, 'engine': None}
+        wall_start = time.perf_counter()
+        cpu_start = get_cpu_seconds()
+        # ru_maxrss only ever grows, so the per-job peak comes from sampling
+        rss_sampler = RssSampler()
+        rss_sampler.start()
+        status = 'failed'
+        try:
+            yield job
+            status = 'ok'
+        finally:
+            peak_rss = rss_sampler.stop()
+            wall = time.perf_counter() - wall_start
+            cpu = get_cpu_seconds() - cpu_start
+            output_path = job['output']
+            pages = count_pages(input_path) if mode == 'pdf' else count_pages(output_path)
+            self.record(
+                kind=kind,
+                mode=mode,
+                engine=job['engine'],
+                status=status,
+                wall_seconds=wall,
+                cpu_seconds=cpu,
+                peak_rss_bytes=peak_rss,
+                page_count=pages,
+                input_bytes=os.path.getsize(input_path) if os.path.exists(input_path) else None,
+                output_bytes=os.path.getsize(output_path) if output_path and os.path.exists(output_path) else None
+            )
+    
+    def record(self, **metrics):
+        """Insert one job row; history errors never fail a conversion"""
+        metrics.setdefault('finished_at', time.time())
+        columns = ', '.join(metrics)
+        placeholders = ', '.join('?' for _ in metrics)
+        try:
+            with self.lock:
+                conn = self.connect()
+                try:
+                    with conn:
+                        conn.execute(f'INSERT INTO jobs ({columns}) VALUES ({placeholders})', list(metrics.values()))
+                finally:
+                    conn.close()
+        except Exception as e:
+            print(f"Could not record job metrics: {e}")
+    
+    def stats(self, since_seconds):
+        """Summarise successful jobs per mode/engine over the last since_seconds"""
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                "SELECT mode, engine, wall_seconds, cpu_seconds, peak_rss_bytes, page_count "
+                "FROM jobs WHERE status = 'ok' AND finished_at >= ?",
+                (time.time() - since_seconds,)
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        groups = {}
+        for mode, engine, wall, cpu, rss, pages in rows:
+            groups.setdefault((mode, engine or '-'), []).append((wall, cpu, rss, pages))
+        
+        summary = []
+        for (mode, engine), jobs in sorted(groups.items()):
+            walls = [j[0] for j in jobs]
+            cpus = [j[1] for j in jobs]
+            rss = [j[2] for j in jobs if j[2] is not None]
+            paged = [(j[3], j[0]) for j in jobs if j[3]]
+            paged_wall = sum(w for _, w in paged)
+            summary.append({
+                'mode': mode,
+                'engine': engine,
+                'jobs': len(jobs),
+                'wall_p50': percentile(walls, 50),
+                'wall_p90': percentile(walls, 90),
+                'wall_p99': percentile(walls, 99),
+                'cpu_p50': percentile(cpus, 50),
+                'cpu_p90': percentile(cpus, 90),
+                'rss_p90': percentile(rss, 90),
+                'pages_per_sec': sum(p for p, _ in paged) / paged_wall if paged_wall else None
+            })
+        return summary
+
+
+def print_stats(days):
+    """Print the job history summary for the `stats` command"""
+    summary = JobHistory().stats(days * 86400)
+    if not summary:
+        print(f"No conversions recorded in the last {days:g} day(s)")
+        return
+    
+    def fmt(value, scale=1, digits=2):
+        return '-' if value is None else f"{value / scale:.{digits}f}"
+    
+    header = f"{'mode':<6}{'engine':<12}{'jobs':>6}{'wall p50':>10}{'p90':>8}{'p99':>8}{'cpu p50':>9}{'p90':>8}{'rss p90 MB':>12}{'pages/s':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in summary:
+        print(
+            f"{row['mode']:<6}{row['engine']:<12}{row['jobs']:>6}"
+            f"{fmt(row['wall_p50']):>10}{fmt(row['wall_p90']):>8}{fmt(row['wall_p99']):>8}"
+            f"{fmt(row['cpu_p50']):>9}{fmt(row['cpu_p90']):>8}"
+            f"{fmt(row['rss_p90'], 1024 * 1024, 1):>12}{fmt(row['pages_per_sec'], 1, 1):>9}"
+        )
+
+# ============ TEXT INDEX ============ 
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def index_path_for(artifact_path):
+    """Location of the text index stored next to a converted artifact"""
+    return str(artifact_path) + '.index.json.gz'
+
+
+class TextIndex:
+    """Inverted index from words to positions in a converted document.
+    
+    For 'pdf' artifacts a posting is (page, x0, y0, x1, y1) in PDF points; for
+    'docx' artifacts it is (paragraph, start, 0, end, 0) with character offsets.
+    Every word also gets a sequence number in reading order, so multi-word queries
+    match phrases. In memory each term maps sequence numbers to decoded postings;
+    on disk postings are flat integer lists so the index stays compact.
+    """
+    
+    def __init__(self, kind, terms=None):
+        self.kind = kind
+        self.terms = terms if terms is not None else {}
+        self.word_count = 1 + max((max(postings) for postings in self.terms.values() if postings), default=-1)
+        # Results of earlier queries; a repeated Enter on the same query is a lookup
+        self.results = {}
+    
+    def add(self, word, unit, x0, y0, x1, y1):
+        self.terms.setdefault(word.lower(), {})[self.word_count] = (
+            unit, int(round(x0)), int(round(y0)), int(round(x1)), int(round(y1))
+        )
+        self.word_count += 1
+        self.results.clear()
+    
+    def postings(self, word):
+        """{sequence number: posting} for a word, in document order"""
+        return self.terms.get(word.lower(), {})
+    
+    def search(self, query):
+        """Return [(unit, [postings])] for units containing the query as a phrase, in document order"""
+        words = tuple(WORD_PATTERN.findall(query.lower()))
+        if not words:
+            return []
+        if words in self.results:
+            return self.results[words]
+        
+        per_word = [self.postings(word) for word in words]
+        if len(per_word) == 1:
+            results = [(unit, list(group)) for unit, group in itertools.groupby(per_word[0].values(), key=lambda p: p[0])]
+            self.results[words] = results
+            return results
+        
+        # Walk the rarest word and look its neighbours up by sequence number
+        anchor = min(range(len(per_word)), key=lambda i: len(per_word[i]))
+        hits = {}
+        for seq in per_word[anchor]:
+            start = seq - anchor
+            phrase = []
+            for offset, postings in enumerate(per_word):
+                posting = postings.get(start + offset)
+                # Consecutive words on the same page/paragraph
+                if posting is None or (phrase and posting[0] != phrase[0][0]):
+                    break
+                phrase.append(posting)
+            else:
+                hits.setdefault(phrase[0][0], []).extend(phrase)
         
-        if package == 'Pillow':
-            from PIL import Image, ImageTk
-            return (Image, ImageTk)
-        else:
-            return importlib.import_module(import_name)
+        results = list(hits.items())
+        self.results[words] = results
+        return results
+    
+    def save(self, path):
+        terms = {
+            word: [value for seq, posting in postings.items() for value in (seq, *posting)]
+            for word, postings in self.terms.items()
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump({'kind': self.kind, 'terms': terms}, f, separators=(',', ':'))
+    
+    @classmethod
+    def load(cls, path):
+        """Read an index and decode every posting list once, so searches do no decoding"""
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        terms = {}
+        for word, flat in data['terms'].items():
+            terms[word] = {flat[i]: tuple(flat[i + 1:i + 6]) for i in range(0, len(flat), 6)}
+        return cls(data['kind'], terms)
 
-# Install and import all required packages
-PIL_Image, PIL_ImageTk = install_and_import('Pillow', 'PIL') 
-Image = PIL_Image
-ImageTk = PIL_ImageTk
+# ============ WORKER POOL ============ 
 
-fitz = install_and_import('PyMuPDF', 'fitz')
+# Each warm worker holds the conversion libraries (about 130 MB), so the default
+# pool stays small instead of matching the CPU count
+WARM_POOL_SIZE = 4
 
-python_docx = install_and_import('python-docx', 'docx')
-Document = python_docx.Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+_STYLESHEET = None
 
-reportlab = install_and_import('reportlab')
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, KeepTogether
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 
-pdf2docx_module = install_and_import('pdf2docx', 'pdf2docx')
-Converter = pdf2docx_module.Converter
+def get_stylesheet():
+    """ReportLab sample stylesheet, built once per process"""
+    global _STYLESHEET
+    if _STYLESHEET is None:
+        _STYLESHEET = getSampleStyleSheet()
+    return _STYLESHEET
+
+
+def preload_worker():
+    """Warm up a worker: libraries are imported with this module, build the shared style/font state"""
+    get_stylesheet()
+    for font_name in ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique'):
+        pdfmetrics.getFont(font_name)
+    # Submodules pdf2docx and python-docx load lazily on first use
+    importlib.import_module('pdf2docx.converter')
+    importlib.import_module('docx.oxml')
+
+
+def warm_worker_main(tasks, conn, max_jobs, max_rss_bytes):
+    """Worker loop: run jobs until told to stop or due for recycling"""
+    preload_worker()
+    
+    for jobs_done in itertools.count(1):
+        task = tasks.get()
+        if task is None:
+            break
+        
+        job_id, fn, args = task
+        conn.send(('start', job_id))
+        cpu_start = time.process_time()
+        try:
+            value = fn(*args)
+            ok = True
+        except Exception as e:
+            ok = False
+            try:
+                pickle.dumps(e)
+                value = e
+            except Exception:
+                value = RuntimeError(f'{type(e).__name__}: {e}')
+        conn.send(('done', job_id, ok, value, time.process_time() - cpu_start))
+        
+        # Recycle after max_jobs or once the worker has grown past the memory threshold
+        rss = get_peak_rss_bytes()
+        if jobs_done >= max_jobs or (max_rss_bytes and rss and rss > max_rss_bytes):
+            break
+    
+    conn.send(('exit',))
+    conn.close()
+
+
+class WarmWorkerPool:
+    """Persistent worker processes with preloaded libraries, recycled after N jobs or a memory threshold"""
+    
+    def __init__(self, processes=None, max_jobs=50, max_rss_mb=1024):
+        self.processes = processes or min(WARM_POOL_SIZE, os.cpu_count() or 1)
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        
+        self.context = multiprocessing.get_context()
+        self.tasks = self.context.Queue()
+        self.lock = threading.Lock()
+        self.job_ids = itertools.count()
+        self.futures = {}
+        # pid -> (process, result pipe, running job id)
+        self.workers = {}
+        self.closed = False
+        
+        for _ in range(self.processes):
+            self.start_worker()
+        
+        self.collector = threading.Thread(target=self.collect_results, daemon=True)
+        self.collector.start()
+    
+    def start_worker(self):
+        # A pipe per worker: sends are synchronous, so nothing is lost if the worker crashes
+        reader, writer = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=warm_worker_main,
+            args=(self.tasks, writer, self.max_jobs, self.max_rss_bytes),
+            daemon=True
+        )
+        process.start()
+        writer.close()
+        self.workers[process.pid] = [process, reader, None]
+    
+    def submit(self, fn, *args):
+        """Queue fn(*args) on a worker; fn must be a module-level function"""
+        future = Future()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('Worker pool is shut down')
+            job_id = next(self.job_ids)
+            self.futures[job_id] = (future, threading.get_ident())
+        self.tasks.put((job_id, fn, args))
+        return future
+    
+    def collect_results(self):
+        """Resolve futures from worker messages and replace recycled or crashed workers"""
+        while True:
+            with self.lock:
+                if self.closed and not self.workers:
+                    break
+                readers = {worker[1]: pid for pid, worker in self.workers.items()}
+            
+            for reader in multiprocessing.connection.wait(list(readers), timeout=1):
+                pid = readers[reader]
+                try:
+                    message = reader.recv()
+                except EOFError:
+                    self.retire_worker(pid, crashed=True)
+                    continue
+                
+                kind = message[0]
+                if kind == 'start':
+                    self.workers[pid][2] = message[1]
+                elif kind == 'done':
+                    _, job_id, ok, value, cpu = message
+                    self.workers[pid][2] = None
+                    with self.lock:
+                        future, thread_id = self.futures.pop(job_id)
+                    POOL_CPU_SECONDS[thread_id] = POOL_CPU_SECONDS.get(thread_id, 0) + cpu
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+                elif kind == 'exit':
+                    self.retire_worker(pid, crashed=False)
+    
+    def retire_worker(self, pid, crashed):
+        """Join a finished worker, fail its job if it crashed, and start a replacement"""
+        with self.lock:
+            process, reader, job_id = self.workers.pop(pid)
+            reader.close()
+            process.join(timeout=5)
+            if crashed and job_id is not None:
+                future, _ = self.futures.pop(job_id)
+                future.set_exception(RuntimeError(f'Worker process exited with code {process.exitcode}'))
+            if not self.closed:
+                self.start_worker()
+    
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            count = len(self.workers)
+        for _ in range(count):
+            self.tasks.put(None)
+        self.collector.join(timeout=10)
+        with self.lock:
+            for process, reader, _ in self.workers.values():
+                process.terminate()
+
+# ============ JOB QUEUE ============ 
+
+JOBS_DB = APP_DATA_DIR / 'jobs.sqlite3'
+CHECKPOINT_DIR = APP_DATA_DIR / 'checkpoints'
+# A running job's owner refreshes its heartbeat this often; one whose heartbeat
+# is older than JOB_STALE_SECONDS is treated as abandoned
+JOB_HEARTBEAT_SECONDS = 15
+JOB_STALE_SECONDS = 120
+
+
+def process_alive(pid):
+    """Whether a process with this pid exists; assumed alive where that cannot be checked"""
+    # os.kill(pid, 0) terminates the process on Windows, so only probe on POSIX
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobFailure(Exception):
+    """Conversion error pinned to the PDF page or DOCX section that was being processed"""
+    
+    def __init__(self, message, failed_at):
+        super().__init__(message)
+        self.failed_at = failed_at
+
+
+class JobQueue:
+    """Persistent conversion queue that checkpoints finished chunks to disk.
+    
+    PDF to Word jobs are parsed chunk_size pages at a time and each parsed chunk
+    is serialized; Word to PDF jobs build chunk_size sections per chunk PDF. After
+    a crash a job resumes from its last finished chunk. Failures are retried with
+    exponential backoff, and a job failing max_page_failures times in a row on the
+    same page (or section) is quarantined instead of retried.
+    """
+    
+    def __init__(self, db_path=JOBS_DB, checkpoint_dir=CHECKPOINT_DIR, chunk_size=20,
+                 max_attempts=5, backoff_seconds=30, max_page_failures=3):
+        self.db_path = Path(db_path)
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_page_failures = max_page_failures
+        self.lock = threading.Lock()
+    
+    def connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                output TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                source_size INTEGER,
+                source_mtime REAL,
+                status TEXT NOT NULL,
+                engine TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                failed_at INTEGER,
+                page_failures INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner_pid INTEGER,
+                heartbeat_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                job_id INTEGER NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                first_unit INTEGER NOT NULL,
+                last_unit INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                PRIMARY KEY (job_id, chunk_index)
+            );
+        """)
+        # Databases created before job ownership was tracked lack these columns
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (('owner_pid', 'INTEGER'), ('heartbeat_at', 'REAL')):
+            if column not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # another process added it first
+        return conn
+    
+    def execute(self, sql, params=()):
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    cursor = conn.execute(sql, params)
+                    return cursor.lastrowid, cursor.rowcount, [dict(row) for row in cursor.fetchall()]
+            finally:
+                conn.close()
+    
+    def enqueue(self, source, output, mode, profile=DEFAULT_PROFILE, claim=False):
+        """Add a job; with claim=True it is marked running for the caller to run_job() right away"""
+        stat = os.stat(source)
+        now = time.time()
+        job_id, _, _ = self.execute(
+            "INSERT INTO jobs (source, output, mode, profile, source_size, source_mtime, status, "
+            "created_at, updated_at, owner_pid, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(source), str(output), mode, profile, stat.st_size, stat.st_mtime,
+             'running' if claim else 'queued', now, now,
+             os.getpid() if claim else None, now if claim else None)
+        )
+        return job_id
+    
+    def recover(self):
+        """Requeue running jobs whose owner process is gone or stale; returns how many"""
+        now = time.time()
+        rows = self.execute("SELECT id, owner_pid, heartbeat_at FROM jobs WHERE status = 'running'")[2]
+        count = 0
+        for row in rows:
+            # A live process (queue run, another window) may own the job right now
+            if (row['owner_pid'] is not None and process_alive(row['owner_pid'])
+                    and (row['heartbeat_at'] or 0) > now - JOB_STALE_SECONDS):
+                continue
+            # Matching the heartbeat skips jobs whose owner touched them since the SELECT
+            _, updated, _ = self.execute(
+                "UPDATE jobs SET status = 'queued', owner_pid = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND heartbeat_at IS ?",
+                (now, row['id'], row['heartbeat_at'])
+            )
+            count += updated
+        return count
+    
+    def cancel(self, job_id):
+        """Stop a job that is waiting for a retry from running again and drop its checkpoints"""
+        self.execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id)
+        )
+        self.discard_checkpoints(job_id)
+    
+    def get(self, job_id):
+        rows = self.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))[2]
+        return rows[0] if rows else None
+    
+    def list_jobs(self):
+        return self.execute("SELECT * FROM jobs ORDER BY id")[2]
+    
+    def claim_next(self):
+        """Mark the oldest job that is due as running and return its id, or None"""
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT id FROM jobs WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY id LIMIT 1",
+                        (time.time(),)
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    now = time.time()
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', owner_pid = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                        (os.getpid(), now, now, row['id'])
+                    )
+                    return row['id']
+            finally:
+                conn.close()
+    
+    def next_due_at(self):
+        """When the next queued job becomes due, None if the queue is empty"""
+        rows = self.execute("SELECT MIN(next_attempt_at) AS due FROM jobs WHERE status = 'queued'")[2]
+        return rows[0]['due'] if rows else None
+    
+    def run_job(self, job_id, converter=None):
+        """Run a claimed job to completion or failure and return its updated row"""
+        job = self.get(job_id)
+        owns_converter = converter is None
+        if owns_converter:
+            converter = DocumentConverter(job['profile'])
+        
+        job_dir = self.checkpoint_dir / str(job_id)
+        # Checkpoints are only valid for the exact source they were made from
+        stat = os.stat(job['source']) if os.path.exists(job['source']) else None
+        if stat is None or stat.st_size != job['source_size'] or stat.st_mtime != job['source_mtime']:
+            self.discard_checkpoints(job_id)
+            if stat is not None:
+                self.execute(
+                    "UPDATE jobs SET source_size = ?, source_mtime = ? WHERE id = ?",
+                    (stat.st_size, stat.st_mtime, job_id)
+                )
+        
+        # Keep the claim fresh so recover() in other processes leaves this job alone
+        heartbeat_stop = threading.Event()
+        def heartbeat():
+            while not heartbeat_stop.wait(JOB_HEARTBEAT_SECONDS):
+                self.execute(
+                    "UPDATE jobs SET owner_pid = ?, heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                    (os.getpid(), time.time(), job_id)
+                )
+        threading.Thread(target=heartbeat, daemon=True).start()
+        
+        try:
+            job_dir.mkdir(parents=True, exist_ok=True)
+            if job['mode'] == 'pdf':
+                engine = self.convert_pdf(job, converter, job_dir)
+            else:
+                engine = self.convert_docx(job, converter, job_dir)
+        except Exception as e:
+            self.record_failure(job, e)
+        else:
+            self.execute(
+                "UPDATE jobs SET status = 'done', engine = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (engine, time.time(), job_id)
+            )
+            self.discard_checkpoints(job_id)
+        finally:
+            heartbeat_stop.set()
+            if owns_converter:
+                converter.shutdown_worker_pool()
+        
+        return self.get(job_id)
+    
+    def run_tracked(self, job_id, converter, history):
+        """run_job() recorded as a 'batch' job in history; returns the updated row"""
+        job = self.get(job_id)
+        try:
+            with history.track('batch', job['mode'], job['source']) as tracked:
+                tracked['output'] = job['output']
+                job = self.run_job(job_id, converter)
+                tracked['engine'] = job['engine']
+                if job['status'] != 'done':
+                    raise RuntimeError(job['last_error'])
+        except RuntimeError:
+            pass
+        return job
+    
+    def run_pending(self, history, converter_factory=DocumentConverter):
+        """Run due jobs until none are left, recording each in history; returns the finished job rows"""
+        # One converter (and so at most one worker pool) per profile, shut down when done
+        converters = {}
+        finished = []
+        try:
+            while True:
+                job_id = self.claim_next()
+                if job_id is None:
+                    return finished
+                job = self.get(job_id)
+                if job['profile'] not in converters:
+                    converters[job['profile']] = converter_factory(job['profile'])
+                finished.append(self.run_tracked(job_id, converters[job['profile']], history))
+        finally:
+            for converter in converters.values():
+                converter.shutdown_worker_pool()
+    
+    def run_chunks(self, job, job_dir, plan, build_chunk, extension, submit_chunk=None, chunk_done=None):
+        """Build each (first_unit, last_unit, units) chunk not yet checkpointed; return chunk paths in order.
+        
+        build_chunk(units, path) builds in this thread; submit_chunk(units, path), when
+        given, returns a Future instead so missing chunks are built concurrently.
+        chunk_done(units, path) is called for every finished chunk, checkpoints from
+        an earlier run first, then each new one as it completes.
+        """
+        done = {
+            row['chunk_index']: row
+            for row in self.execute("SELECT * FROM chunks WHERE job_id = ?", (job['id'],))[2]
+        }
+        
+        paths = []
+        missing = []
+        for index, (first, last, units) in enumerate(plan):
+            path = str(job_dir / f'chunk_{index:05d}.{extension}')
+            row = done.get(index)
+            if row and row['first_unit'] == first and row['last_unit'] == last and os.path.exists(row['path']):
+                paths.append(row['path'])
+                if chunk_done is not None:
+                    chunk_done(units, row['path'])
+            else:
+                paths.append(path)
+                missing.append((index, first, last, units, path))
+        
+        def checkpoint(index, first, last, units, path):
+            # Chunks are written to a temporary name so a crash never leaves a half-written checkpoint
+            os.replace(path + '.tmp', path)
+            self.execute(
+                "INSERT OR REPLACE INTO chunks (job_id, chunk_index, first_unit, last_unit, path) VALUES (?, ?, ?, ?, ?)",
+                (job['id'], index, first, last, path)
+            )
+            if chunk_done is not None:
+                chunk_done(units, path)
+        
+        if submit_chunk is None:
+            for index, first, last, units, path in missing:
+                build_chunk(units, path + '.tmp')
+                checkpoint(index, first, last, units, path)
+            return paths
+        
+        futures = {submit_chunk(units, path + '.tmp'): (index, first, last, units, path) for index, first, last, units, path in missing}
+        failure = None
+        for future in as_completed(futures):
+            index, first, last, units, path = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                # Keep checkpointing the chunks that do finish, report the earliest failure
+                if failure is None or first < failure.failed_at:
+                    failure = JobFailure(str(e), first)
+                continue
+            checkpoint(index, first, last, units, path)
+        if failure is not None:
+            raise failure
+        return paths
+    
+    def make_plan(self, units):
+        """Split units (page or section numbers) into checkpoint chunks"""
+        return [
+            (units[i], units[min(i + self.chunk_size, len(units)) - 1], units[i:i + self.chunk_size])
+            for i in range(0, len(units), self.chunk_size)
+        ]
+    
+    def convert_pdf(self, job, converter, job_dir):
+        """PDF to Word with the layout engine parsed in checkpointed page chunks"""
+        source, output = job['source'], job['output']
+        tmp_output = output + '.part'
+        
+        engine = converter.pdf_engine
+        if engine == 'auto':
+            engine = converter.classify_pdf(source)
+        if engine == 'fast':
+            # The fast path takes seconds even for long documents; no checkpoints needed
+            converter.convert_pdf_to_docx_fast(source, tmp_output)
+            converter.optimize_docx(tmp_output)
+            os.replace(tmp_output, output)
+            return engine
+        
+        with fitz.open(source) as pdf:
+            image_pages = converter.find_image_only_pages(pdf)
+            image_set = set(image_pages)
+            text_pages = [n for n in range(len(pdf)) if n not in image_set]
+            
+            if text_pages:
+                plan = self.make_plan(text_pages)
+                pages_before = {}
+                for i, (first, _, _) in enumerate(plan):
+                    pages_before[first] = i * self.chunk_size
+                
+                def parse_chunk(pages, path):
+                    current = {'page': pages[0]}
+                    forward = converter.progress_callback
+                    
+                    def track(stage, done, total):
+                        # pdf2docx logs each page before parsing it
+                        current['page'] = pages[min(max(done, 1), len(pages)) - 1]
+                        if forward is not None:
+                            forward('parse', pages_before[pages[0]] + done, len(text_pages))
+                    
+                    converter.progress_callback = track
+                    try:
+                        with converter.track_pdf2docx_progress():
+                            cv = Converter(source)
+                            try:
+                                settings = dict(cv.default_settings, **converter.pdf2docx_options)
+                                cv.parse(pages=pages, **settings)
+                                cv.serialize(path)
+                            finally:
+                                cv.close()
+                    except Exception as e:
+                        raise JobFailure(f'Page {current["page"] + 1}: {e}', current['page'])
+                    finally:
+                        converter.progress_callback = forward
+                
+                chunk_paths = self.run_chunks(job, job_dir, plan, parse_chunk, 'json')
+                
+                # Rebuild the parsed layout from every checkpoint and write the document once
+                cv = Converter(source)
+                try:
+                    settings = dict(cv.default_settings, **converter.pdf2docx_options)
+                    for path in chunk_paths:
+                        cv.deserialize(path)
+                    cv.make_docx(tmp_output, **settings)
+                finally:
+                    cv.close()
+            
+            if image_pages and not converter.add_passthrough_pages(tmp_output, pdf, image_pages, text_pages):
+                # Scans could not be put back in page order: lay out every page instead
+                converter.convert_pdf_to_docx_layout(source, tmp_output)
+        
+        converter.optimize_docx(tmp_output)
+        os.replace(tmp_output, output)
+        return engine if text_pages else 'passthrough'
+    
+    def convert_docx(self, job, converter, job_dir):
+        """Word to PDF with sections built into checkpointed chunk PDFs, then merged"""
+        segments = converter.split_docx_segments(Document(job['source']))
+        plan = self.make_plan(list(range(len(segments))))
+        
+        # Pages and sections of finished chunks, in whatever order they finish
+        progress = {'pages': 0, 'sections': 0}
+        forward = converter.progress_callback
+        
+        def report(pages, sections):
+            # The page total is unknown until every section is laid out: extrapolate it from sections
+            if forward is not None and sections:
+                forward('layout', pages, max(pages, round(pages * len(segments) / sections)))
+        
+        def chunk_done(indices, path):
+            progress['pages'] += count_pages(path) or 0
+            progress['sections'] += len(indices)
+            report(progress['pages'], progress['sections'])
+        
+        def build_chunk(indices, path):
+            def track(stage, done, total):
+                # build_pdf counts this chunk's pages against its own estimated total
+                report(progress['pages'] + done, progress['sections'] + len(indices) * done / max(total, done))
+            
+            converter.progress_callback = track
+            story = []
+            try:
+                for index in indices:
+                    if story:
+                        story.append(PageBreak())
+                    story.extend(converter.build_story(segments[index]))
+                converter.build_pdf(story, path)
+            except Exception as e:
+                raise JobFailure(f'Section {indices[0] + 1}: {e}', indices[0])
+            finally:
+                converter.progress_callback = forward
+        
+        submit_chunk = None
+        if converter.parallel_build and len(plan) > 1 and (os.cpu_count() or 1) > 1:
+            pool = converter.get_worker_pool()
+            
+            def submit_chunk(indices, path):
+                return pool.submit(build_pdf_segments, job['source'], indices, path, converter.profile)
+        
+        chunk_paths = self.run_chunks(job, job_dir, plan, build_chunk, 'pdf', submit_chunk, chunk_done)
+        tmp_output = job['output'] + '.part'
+        converter.merge_pdf_segments(chunk_paths, tmp_output)
+        os.replace(tmp_output, job['output'])
+        return 'parallel' if submit_chunk else 'sequential'
+    
+    def record_failure(self, job, error):
+        """Schedule a retry with exponential backoff, or quarantine/fail the job"""
+        attempts = job['attempts'] + 1
+        failed_at = getattr(error, 'failed_at', None)
+        if failed_at is not None and failed_at == job['failed_at']:
+            page_failures = job['page_failures'] + 1
+        else:
+            page_failures = 1 if failed_at is not None else 0
+        
+        if page_failures >= self.max_page_failures:
+            status = 'quarantined'
+        elif attempts >= self.max_attempts:
+            status = 'failed'
+        else:
+            status = 'queued'
+        next_attempt_at = time.time() + self.backoff_seconds * 2 ** (attempts - 1)
+        
+        self.execute(
+            "UPDATE jobs SET status = ?, attempts = ?, next_attempt_at = ?, failed_at = ?, page_failures = ?, "
+            "last_error = ?, updated_at = ? WHERE id = ?",
+            (status, attempts, next_attempt_at, failed_at, page_failures, str(error), time.time(), job['id'])
+        )
+    
+    def discard_checkpoints(self, job_id):
+        self.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+        shutil.rmtree(self.checkpoint_dir / str(job_id), ignore_errors=True)
+
+
+def print_jobs(jobs):
+    """Print job rows for the `queue list` and `queue run` commands"""
+    if not jobs:
+        print("No jobs")
+        return
+    for job in jobs:
+        line = f"#{job['id']:<5}{job['status']:<12}{job['mode']:<5}{job['profile']:<14}{job['source']}"
+        if job['status'] != 'done' and job['last_error']:
+            line += f"  [attempt {job['attempts']}: {job['last_error']}]"
+        print(line)
 
 # ============ MAIN APPLICATION ============ 
 
-class ConverterApp:
+# The Tk loop drains the UI event queue this often, handling at most UI_MAX_EVENTS per tick
+UI_POLL_MS = 50
+UI_MAX_EVENTS = 500
+
+class ConverterApp(DocumentConverter):
     def __init__(self):
+        super().__init__()
         self.window = tk.Tk()
         self.window.title("Document Converter")
         self.window.state('zoomed')
@@ -81,9 +2470,27 @@ class ConverterApp:
         self.current_mode = None
         self.converted_file = None
         self.preview_file = None
+        self.preflight_info = None
         self.preview_image = None
+        self.preview_pages = []
+        self.preview_text_widget = None
+        self.preview_paragraph_starts = {}
+        self.text_index = None
+        self.search_query = None
+        self.search_hits = []
+        self.search_position = -1
+        self.history = JobHistory()
+        self.job_queue = JobQueue()
+        
+        # Worker threads never touch Tk directly: UI callbacks and progress
+        # reports go through one queue that the Tk loop drains
+        self.ui_queue = queue.Queue()
+        self.progress_callback = self.queue_progress
+        self.progress_state = None
+        
         self.setup_fonts()
         self.setup_ui()
+        self.window.after(UI_POLL_MS, self.drain_ui_queue)
         
         # Bind resize event
         self.window.bind('<Configure>', self.on_window_resize)
@@ -149,6 +2556,37 @@ class ConverterApp:
             1
         ) 
         
+        # Profile selector
+        profile_row = tk.Frame(left_panel, bg='#f5f5f7')
+        profile_row.pack(fill='x', pady=(20, 0))
+        
+        tk.Label(
+            profile_row,
+            text='Profile',
+            font=self.font_medium,
+            bg='#f5f5f7',
+            fg='#1d1d1f'
+        ).pack(side='left')
+        
+        self.profile_var = tk.StringVar(value=self.profile)
+        profile_box = ttk.Combobox(
+            profile_row,
+            textvariable=self.profile_var,
+            values=list(CONVERSION_PROFILES),
+            state='readonly',
+            width=16
+        )
+        profile_box.pack(side='left', padx=(12, 0))
+        profile_box.bind('<<ComboboxSelected>>', self.on_profile_selected)
+        
+        tk.Label(
+            profile_row,
+            text='draft is fastest, high-fidelity is best for final output',
+            font=self.font_regular,
+            bg='#f5f5f7',
+            fg='#86868b'
+        ).pack(side='left', padx=(12, 0))
+        
         # File info frame
         info_container = tk.Frame(left_panel, bg='#f5f5f7')
         info_container.pack(fill='x', pady=(25, 15))
@@ -196,6 +2634,27 @@ class ConverterApp:
         status_container = tk.Frame(left_panel, bg='#f5f5f7')
         status_container.pack(fill='x', side='bottom', pady=(10, 0))
         
+        # Progress bar, shown while a conversion is running
+        self.progress_frame = tk.Frame(left_panel, bg='#f5f5f7')
+        
+        self.progress_bar = ttk.Progressbar(
+            self.progress_frame,
+            orient='horizontal',
+            mode='determinate',
+            maximum=100
+        )
+        self.progress_bar.pack(fill='x')
+        
+        self.progress_label = tk.Label(
+            self.progress_frame,
+            text='',
+            font=self.font_regular,
+            bg='#f5f5f7',
+            fg='#86868b',
+            anchor='w'
+        )
+        self.progress_label.pack(fill='x', pady=(4, 0))
+        
         self.status_frame = tk.Frame(status_container, bg='#ffffff', relief='flat', bd=0, height=44)
         self.status_frame.pack(fill='x')
         self.status_frame.pack_propagate(False)
@@ -212,6 +2671,23 @@ class ConverterApp:
         )
         self.status_label.pack(fill='both')
         
+        # Output size savings, shown under the status after a PDF to Word download
+        self.size_label = tk.Label(
+            status_container,
+            text='',
+            font=self.font_regular,
+            bg='#ffffff',
+            fg='#86868b',
+            anchor='w',
+            justify='left',
+            padx=15,
+            pady=8
+        )
+        status_container.bind(
+            '<Configure>',
+            lambda event: self.size_label.configure(wraplength=max(100, event.width - 30))
+        )
+        
         # ============ RIGHT PANEL - PREVIEW ============
         right_panel = tk.Frame(main_container, bg='#ffffff', relief='flat', bd=0)
         right_panel.grid(row=0, column=1, sticky='nsew', padx=(15, 0))
@@ -230,6 +2706,32 @@ class ConverterApp:
         )
         preview_title.pack(side='left')
         
+        # Search box, backed by the text index built during conversion
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+            preview_header,
+            textvariable=self.search_var,
+            font=self.font_regular,
+            bg='#f5f5f7',
+            fg='#1d1d1f',
+            relief='flat',
+            highlightthickness=1,
+            highlightbackground='#e6e6e8',
+            highlightcolor='#0066cc',
+            width=24
+        )
+        self.search_entry.pack(side='left', padx=(20, 0), ipady=4)
+        self.search_entry.bind('<Return>', self.on_search)
+        
+        self.search_status = tk.Label(
+            preview_header,
+            text='',
+            font=self.font_regular,
+            bg='#ffffff',
+            fg='#86868b'
+        )
+        self.search_status.pack(side='left', padx=(8, 0))
+        
         self.preview_filename = tk.Label(
             preview_header,
             text='',
@@ -326,6 +2828,7 @@ class ConverterApp:
         subtext_label.pack(pady=(10, 0))
         
         self.preview_filename.configure(text='')
+        self.reset_search()
     
     def create_option_card(self, parent, title, description, mode, col):
         card = tk.Frame(
@@ -408,6 +2911,14 @@ class ConverterApp:
         
         return card
     
+    def on_profile_selected(self, event=None):
+        """Apply the selected profile to the next conversion"""
+        self.apply_profile(self.profile_var.get())
+        self.status_label.configure(
+            text=f'Profile: {self.profile} - applies to the next conversion',
+            fg='#1d1d1f'
+        )
+    
     def select_file(self, mode):
         if mode == 'pdf':
             filetypes = [('PDF files', '*.pdf')]
@@ -425,7 +2936,7 @@ class ConverterApp:
             self.selected_file = file_path
             self.current_mode = mode
             self.converted_file = None
-            self.preview_file = None
+            self.discard_preview()
             
             # Clear previous preview
             self.show_preview_placeholder()
@@ -436,6 +2947,15 @@ class ConverterApp:
                 fg='#1d1d1f'
             )
             
+            # Reject bad inputs before any conversion is scheduled
+            try:
+                self.preflight_info = self.preflight(file_path, mode)
+            except PreflightError as e:
+                self.preflight_info = None
+                self.selected_file = None
+                self.preflight_rejected(filename, str(e))
+                return
+            
             # Disable download button until conversion is complete
             self.download_btn.configure(
                 state='disabled',
@@ -450,30 +2970,119 @@ class ConverterApp:
                 fg='#1d1d1f'
             )
             
+            self.start_progress(self.preflight_info.get('estimated_seconds'))
+            
             # Start preview generation thread
             thread = threading.Thread(target=self.generate_preview)
             thread.daemon = True
             thread.start()
     
+    def post_ui(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread; safe to call from any thread"""
+        self.ui_queue.put(('call', callback, args))
+    
+    def queue_progress(self, stage, done, total):
+        self.ui_queue.put(('progress', stage, done, total))
+    
+    def drain_ui_queue(self):
+        """Run queued UI callbacks and apply only the latest progress per stage"""
+        latest_progress = {}
+        calls = []
+        try:
+            for _ in range(UI_MAX_EVENTS):
+                event = self.ui_queue.get_nowait()
+                if event[0] == 'progress':
+                    latest_progress[event[1]] = event[2:]
+                else:
+                    calls.append(event)
+        except queue.Empty:
+            pass
+        
+        for stage, (done, total) in latest_progress.items():
+            self.update_progress(stage, done, total)
+        for _, callback, args in calls:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"UI callback failed: {e}")
+        
+        self.window.after(UI_POLL_MS, self.drain_ui_queue)
+    
+    def start_progress(self, estimated_seconds=None):
+        """Reset and show the progress bar for a new conversion"""
+        self.size_label.pack_forget()
+        # Share of total work per stage: layout analysis dominates PDF to Word,
+        # Word to PDF only reports layout
+        weights = {'parse': 0.8, 'layout': 0.2} if self.current_mode == 'pdf' else {'layout': 1.0}
+        now = time.perf_counter()
+        self.progress_state = {'weights': weights, 'start': now, 'stage_start': {}, 'stages': {}}
+        
+        self.progress_bar.configure(value=0)
+        if estimated_seconds:
+            eta = int(round(estimated_seconds))
+            self.progress_label.configure(text=f'Starting...  ·  estimated {eta // 60}:{eta % 60:02d}')
+        else:
+            self.progress_label.configure(text='Starting...')
+        self.progress_frame.pack(fill='x', side='bottom', pady=(10, 0))
+    
+    def update_progress(self, stage, done, total):
+        """Drive the progress bar, pages/sec and ETA from a stage report"""
+        state = self.progress_state
+        if state is None or stage not in state['weights'] or not total:
+            return
+        
+        now = time.perf_counter()
+        # A stage starts when the previous one last reported (or at job start)
+        stage_start = state['stage_start'].setdefault(
+            stage, max([state['start']] + [t for _, _, t in state['stages'].values()])
+        )
+        state['stages'][stage] = (done, total, now)
+        
+        fraction = 0
+        for name, weight in state['weights'].items():
+            if name in state['stages']:
+                stage_done, stage_total, _ = state['stages'][name]
+                fraction += weight * min(1, stage_done / stage_total)
+        
+        elapsed = now - state['start']
+        rate = done / (now - stage_start) if now > stage_start else 0
+        verb = 'Parsing' if stage == 'parse' else 'Laying out'
+        text = f'{verb} page {done} of {total}'
+        if rate:
+            text += f'  ·  {rate:.1f} pages/s'
+        if 0 < fraction < 1:
+            eta = int(elapsed * (1 - fraction) / fraction)
+            text += f'  ·  ETA {eta // 60}:{eta % 60:02d}'
+        
+        self.progress_bar.configure(value=fraction * 100)
+        self.progress_label.configure(text=text)
+    
+    def finish_progress(self):
+        self.progress_state = None
+        self.progress_frame.pack_forget()
+    
     def generate_preview(self):
         """Generate preview only - NO DOWNLOAD"""
         error = None
         preview_path = None
+        text_index = None
         
         try:
             # Create temporary file for preview
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf' if self.current_mode == 'docx' else '.docx') as tmp_file:
                 preview_path = tmp_file.name
             
-            if self.current_mode == 'pdf':
-                # PDF to Word preview
-                cv = Converter(self.selected_file)
-                cv.convert(preview_path, start=0, end=None)
-                cv.close()
-                
-            else:
-                # Word to PDF preview - WITH COMPLETE FORMATTING PRESERVATION
-                self.convert_docx_to_pdf_preserve_formatting(self.selected_file, preview_path)
+            with self.history.track('preview', self.current_mode, self.selected_file) as job:
+                job['output'] = preview_path
+                # PDF to Word, or Word to PDF WITH COMPLETE FORMATTING PRESERVATION
+                job['engine'] = self.convert_file(self.selected_file, preview_path, self.current_mode, self.preflight_info)
+            
+            # Index the preview on this thread, while its pages are in the OS cache, and hand
+            # the decoded index to the UI so searching never waits on disk or JSON parsing
+            try:
+                text_index = self.build_text_index(preview_path)
+            except Exception as e:
+                print(f"Could not index preview: {e}")
                 
         except Exception as e:
             error = str(e)
@@ -481,175 +3090,9 @@ class ConverterApp:
                 os.unlink(preview_path)
         
         if error:
-            self.window.after(0, lambda err=error: self.preview_error(err))
+            self.post_ui(self.preview_error, error)
         else:
-            self.preview_file = preview_path
-            self.window.after(0, lambda path=preview_path: self.preview_success(path))
-    
-    def convert_docx_to_pdf_preserve_formatting(self, docx_path, pdf_path):
-        """Convert DOCX to PDF while preserving ALL formatting, spacing, and layout"""
-        doc = Document(docx_path)
-        
-        # Create PDF document with proper margins
-        doc_template = SimpleDocTemplate(
-            pdf_path,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
-        
-        story = []
-        
-        # Process each paragraph individually to preserve spacing
-        for paragraph in doc.paragraphs:
-            # Get paragraph formatting
-            p_format = paragraph.paragraph_format
-            
-            # Calculate spacing values in points
-            space_before = self.get_paragraph_spacing(p_format.space_before)
-            space_after = self.get_paragraph_spacing(p_format.space_after)
-            line_spacing = self.get_line_spacing(p_format.line_spacing)
-            
-            # Get alignment
-            alignment = self.get_paragraph_alignment(paragraph.alignment)
-            
-            # Get indentation
-            left_indent = self.get_indent(p_format.left_indent)
-            right_indent = self.get_indent(p_format.right_indent)
-            first_line_indent = self.get_indent(p_format.first_line_indent)
-            
-            # Add space before paragraph if needed
-            if space_before > 0:
-                story.append(Spacer(1, space_before))
-            
-            # Process runs to preserve inline formatting
-            if len(paragraph.runs) > 0:
-                # Build formatted text with proper XML tags
-                formatted_text = self.build_formatted_text(paragraph.runs)
-                
-                if formatted_text:
-                    # Create paragraph style with all formatting
-                    style_name = f'ParaStyle_{len(story)}'
-                    p_style = ParagraphStyle(
-                        style_name,
-                        parent=getSampleStyleSheet()['Normal'],
-                        fontName='Helvetica',
-                        fontSize=11,
-                        leading=line_spacing,
-                        alignment=alignment,
-                        leftIndent=left_indent,
-                        rightIndent=right_indent,
-                        firstLineIndent=first_line_indent
-                    )
-                    
-                    # Create paragraph and add to story
-                    p = Paragraph(formatted_text, p_style)
-                    story.append(p)
-            
-            # Add space after paragraph if needed
-            if space_after > 0:
-                story.append(Spacer(1, space_after))
-        
-        # Build the PDF
-        doc_template.build(story)
-    
-    def get_paragraph_spacing(self, spacing_value):
-        """Convert Word spacing to points"""
-        if spacing_value is None:
-            return 0
-        try:
-            return spacing_value.pt
-        except:
-            return 0
-    
-    def get_line_spacing(self, line_spacing):
-        """Convert Word line spacing to points"""
-        if line_spacing is None:
-            return 14  # Default line spacing
-        
-        try:
-            if hasattr(line_spacing, 'pt'):
-                return line_spacing.pt
-            else:
-                # If it's a multiple, convert to points (assuming 12pt base)
-                return line_spacing * 12
-        except:
-            return 14
-    
-    def get_indent(self, indent_value):
-        """Convert Word indent to points"""
-        if indent_value is None:
-            return 0
-        try:
-            return indent_value.pt
-        except:
-            return 0
-    
-    def get_paragraph_alignment(self, alignment):
-        """Convert Word alignment to ReportLab alignment"""
-        if alignment is None:
-            return TA_LEFT
-        
-        alignment_map = {
-            WD_ALIGN_PARAGRAPH.LEFT: TA_LEFT,
-            WD_ALIGN_PARAGRAPH.CENTER: TA_CENTER,
-            WD_ALIGN_PARAGRAPH.RIGHT: TA_RIGHT,
-            WD_ALIGN_PARAGRAPH.JUSTIFY: TA_JUSTIFY
-        }
-        return alignment_map.get(alignment, TA_LEFT)
-    
-    def build_formatted_text(self, runs):
-        """Build formatted text from runs with proper XML tags"""
-        formatted_parts = []
-        
-        for run in runs:
-            text = run.text
-            if not text:
-                continue
-            
-            # Clean the text
-            clean_text = self.clean_text(text)
-            if not clean_text:
-                continue
-            
-            # Escape XML characters
-            safe_text = self.escape_xml_chars(clean_text)
-            
-            # Apply formatting tags
-            if run.bold:
-                safe_text = f"<b>{safe_text}</b>"
-            if run.italic:
-                safe_text = f"<i>{safe_text}</i>"
-            if run.underline:
-                safe_text = f"<u>{safe_text}</u>"
-            
-            formatted_parts.append(safe_text)
-        
-        return ''.join(formatted_parts)
-    
-    def escape_xml_chars(self, text):
-        """Escape XML special characters for ReportLab"""
-        if not text:
-            return ""
-        text = text.replace('&', '&amp;')
-        text = text.replace('<', '&lt;')
-        text = text.replace('>', '&gt;')
-        return text
-    
-    def clean_text(self, text):
-        """Clean text while preserving all meaningful characters"""
-        if not text:
-            return ""
-        
-        # Remove only absolute control characters
-        cleaned = ''.join(char for char in text if ord(char) >= 32 or char == '\n' or char == '\t' or char == '\r')
-        
-        # Remove any remaining control characters
-        cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', cleaned)
-        
-        return cleaned
+            self.post_ui(self.preview_success, preview_path, text_index)
     
     def download_file(self):
         """Download the converted file - ONLY WHEN DOWNLOAD BUTTON IS CLICKED"""
@@ -692,6 +3135,8 @@ class ConverterApp:
             fg='#1d1d1f'
         )
         
+        self.start_progress(self.preflight_info.get('estimated_seconds') if self.preflight_info else None)
+        
         thread = threading.Thread(target=self.convert_for_download)
         thread.daemon = True
         thread.start()
@@ -700,36 +3145,47 @@ class ConverterApp:
         """Convert file for permanent storage and download"""
         error = None
         output_path = None
+        job_id = None
         
         try:
             output_path = str(Path(self.selected_file).with_suffix('.docx' if self.current_mode == 'pdf' else '.pdf'))
             
             os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else '.', exist_ok=True)
             
-            if self.current_mode == 'pdf':
-                cv = Converter(self.selected_file)
-                cv.convert(output_path, start=0, end=None)
-                cv.close()
-                
-            else:
-                self.convert_docx_to_pdf_preserve_formatting(self.selected_file, output_path)
+            # Downloads go through the durable queue so a crash can resume from the last checkpoint
+            job_id = self.job_queue.enqueue(self.selected_file, output_path, self.current_mode, self.profile, claim=True)
+            with self.history.track('download', self.current_mode, self.selected_file) as job:
+                job['output'] = output_path
+                result = self.job_queue.run_job(job_id, self)
+                job['engine'] = result['engine']
+                if result['status'] != 'done':
+                    raise RuntimeError(result['last_error'])
                 
         except Exception as e:
             error = str(e)
         
         if error:
-            self.window.after(0, lambda err=error: self.conversion_error(err))
+            # The user has seen the failure and retries with a new job; do not rerun this one on later launches
+            if job_id is not None:
+                self.job_queue.cancel(job_id)
+            self.post_ui(self.conversion_error, error)
         else:
             self.converted_file = output_path
-            self.window.after(0, lambda: self.download_ready())
+            self.post_ui(self.download_ready)
     
     def download_ready(self):
         """Called when conversion for download is complete"""
+        self.finish_progress()
+        
         self.status_label.configure(
             text='Conversion complete - Ready to download',
             fg='#1d1d1f'
         )
         
+        if self.current_mode == 'pdf' and self.size_report:
+            self.size_label.configure(text=format_size_report(self.size_report))
+            self.size_label.pack(fill='x')
+        
         self.download_btn.configure(
             state='normal',
             bg='#34a853',
@@ -742,7 +3198,22 @@ class ConverterApp:
         
         self.download_file()
     
-    def preview_success(self, preview_path):
+    def discard_preview(self):
+        """Delete the current preview and its stored text index from the temp directory"""
+        if self.preview_file:
+            for path in (self.preview_file, index_path_for(self.preview_file)):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            self.preview_file = None
+    
+    def preview_success(self, preview_path, text_index=None):
+        self.finish_progress()
+        # Set on the UI thread so the replaced preview is always the one deleted
+        self.discard_preview()
+        self.preview_file = preview_path
+        
         self.status_label.configure(
             text='Preview generated',
             fg='#1d1d1f'
@@ -769,8 +3240,34 @@ class ConverterApp:
             self.preview_pdf(preview_path)
         else:
             self.preview_docx(preview_path)
+        
+        self.reset_search()
+        self.text_index = text_index
+    
+    def preflight_rejected(self, filename, reason):
+        self.status_label.configure(
+            text='File rejected',
+            fg='#ff3b30'
+        )
+        
+        self.file_label.configure(
+            text=f'Rejected: {filename}',
+            fg='#ff3b30'
+        )
+        
+        self.download_btn.configure(
+            state='disabled',
+            bg='#86868b',
+            fg='#ffffff',
+            activebackground='#666666',
+            cursor=''
+        )
+        
+        messagebox.showerror('Cannot Convert File', f'{filename} cannot be converted.\n\n{reason}')
     
     def preview_error(self, error_msg):
+        self.finish_progress()
+        
         self.status_label.configure(
             text='Preview generation failed',
             fg='#ff3b30'
@@ -788,6 +3285,8 @@ class ConverterApp:
         messagebox.showerror('Error', f'Failed to generate preview.\n\n{error_msg}')
     
     def conversion_error(self, error_msg):
+        self.finish_progress()
+        
         self.status_label.configure(
             text='Conversion failed',
             fg='#ff3b30'
@@ -809,6 +3308,8 @@ class ConverterApp:
         # Clear inner frame
         for widget in self.preview_inner.winfo_children():
             widget.destroy()
+        self.preview_pages = []
+        self.preview_text_widget = None
         
         try:
             doc = fitz.open(pdf_path)
@@ -822,6 +3323,8 @@ class ConverterApp:
                 page = doc[page_num]
                 
                 zoom = canvas_width / page.rect.width
+                if self.preview_dpi:
+                    zoom = min(zoom, self.preview_dpi / 72)
                 mat = fitz.Matrix(zoom, zoom)
                 pix = page.get_pixmap(matrix=mat, alpha=False)
                 
@@ -850,6 +3353,14 @@ class ConverterApp:
                     bd=0
                 )
                 image_label.pack()
+                
+                # Keep the image alive and remember the scale for search highlights
+                self.preview_pages.append({
+                    'label': image_label,
+                    'image': img,
+                    'photo': self.preview_image,
+                    'zoom': zoom
+                })
             
             doc.close()
             
@@ -867,6 +3378,8 @@ class ConverterApp:
         # Clear inner frame
         for widget in self.preview_inner.winfo_children():
             widget.destroy()
+        self.preview_pages = []
+        self.preview_paragraph_starts = {}
         
         try:
             doc = Document(docx_path)
@@ -900,15 +3413,19 @@ class ConverterApp:
             )
             text_widget.pack(fill='both', expand=True)
             
-            for paragraph in doc.paragraphs:
+            for para_num, paragraph in enumerate(doc.paragraphs):
                 if paragraph.text.strip():
                     clean_text = self.clean_text(paragraph.text)
                     if clean_text:
+                        self.preview_paragraph_starts[para_num] = text_widget.index('end-1c')
                         text_widget.insert('end', clean_text + '\n\n')
                 else:
                     text_widget.insert('end', '\n')
             
+            text_widget.tag_configure('search_hit', background='#ffe58f')
+            text_widget.tag_configure('search_current', background='#ffc53d')
             text_widget.configure(state='disabled')
+            self.preview_text_widget = text_widget
             
         except Exception as e:
             error_label = tk.Label(
@@ -920,11 +3437,420 @@ class ConverterApp:
             )
             error_label.pack(expand=True)
     
+    def reset_search(self):
+        self.text_index = None
+        self.search_query = None
+        self.search_hits = []
+        self.search_position = -1
+        self.search_status.configure(text='')
+    
+    def on_search(self, event=None):
+        """Jump to the next page/paragraph matching the search box; Enter again moves on"""
+        if self.text_index is None:
+            self.search_status.configure(text='No preview to search')
+            return
+        
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        
+        if query != self.search_query:
+            self.search_query = query
+            self.search_hits = self.text_index.search(query)
+            self.search_position = -1
+        
+        if not self.search_hits:
+            self.search_status.configure(text='No matches')
+            return
+        
+        self.search_position = (self.search_position + 1) % len(self.search_hits)
+        unit, postings = self.search_hits[self.search_position]
+        self.search_status.configure(text=f'{self.search_position + 1} of {len(self.search_hits)}')
+        
+        if self.text_index.kind == 'pdf':
+            self.show_pdf_hits(unit, postings)
+        else:
+            self.show_docx_hits(unit, postings)
+    
+    def show_pdf_hits(self, page_num, postings):
+        """Highlight hit boxes on a rendered preview page and scroll to the first one"""
+        if page_num >= len(self.preview_pages):
+            return
+        
+        # Restore highlights left on other pages
+        for page in self.preview_pages:
+            if page.get('highlighted'):
+                page['photo'] = ImageTk.PhotoImage(page['image'])
+                page['label'].configure(image=page['photo'])
+                page['highlighted'] = False
+        
+        page = self.preview_pages[page_num]
+        zoom = page['zoom']
+        overlay = Image.new('RGBA', page['image'].size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        for _, x0, y0, x1, y1 in postings:
+            draw.rectangle([x0 * zoom, y0 * zoom, x1 * zoom, y1 * zoom], fill=(255, 197, 61, 110))
+        highlighted = Image.alpha_composite(page['image'].convert('RGBA'), overlay)
+        
+        page['photo'] = ImageTk.PhotoImage(highlighted)
+        page['label'].configure(image=page['photo'])
+        page['highlighted'] = True
+        
+        # Scroll so the first hit sits near the top of the view
+        self.preview_inner.update_idletasks()
+        label = page['label']
+        y = label.winfo_rooty() - self.preview_inner.winfo_rooty() + postings[0][2] * zoom - 40
+        total = max(1, self.preview_inner.winfo_height())
+        self.preview_canvas.yview_moveto(max(0, y / total))
+    
+    def show_docx_hits(self, para_num, postings):
+        """Tag hits in the DOCX preview text and scroll to them"""
+        text_widget = self.preview_text_widget
+        start = self.preview_paragraph_starts.get(para_num)
+        if text_widget is None or start is None:
+            return
+        
+        text_widget.tag_remove('search_hit', '1.0', 'end')
+        text_widget.tag_remove('search_current', '1.0', 'end')
+        for i, (_, char_start, _, char_end, _) in enumerate(postings):
+            tag = 'search_current' if i == 0 else 'search_hit'
+            text_widget.tag_add(tag, f'{start} + {char_start} chars', f'{start} + {char_end} chars')
+        
+        text_widget.see(f'{start} + {postings[0][1]} chars')
+        
+        # Bring the text widget itself into view in the preview canvas
+        self.preview_inner.update_idletasks()
+        y = text_widget.winfo_rooty() - self.preview_inner.winfo_rooty() - 40
+        total = max(1, self.preview_inner.winfo_height())
+        self.preview_canvas.yview_moveto(max(0, y / total))
+    
+    def resume_jobs(self):
+        """Finish conversions interrupted by a crash or restart, from their last checkpoint"""
+        finished = self.job_queue.run_pending(self.history)
+        if finished:
+            done = sum(1 for job in finished if job['status'] == 'done')
+            self.post_ui(self.set_status, f'Resumed {len(finished)} unfinished conversion(s), {done} completed')
+    
+    def set_status(self, text, color='#1d1d1f'):
+        self.status_label.configure(
+            text=text,
+            fg=color
+        )
+    
     def run(self):
-        self.window.mainloop()
+        # Requeue before any new job is added, then resume in the background
+        self.job_queue.recover()
+        threading.Thread(target=self.resume_jobs, daemon=True).start()
+        try:
+            self.window.mainloop()
+        finally:
+            self.discard_preview()
+            self.shutdown_worker_pool()
+
+
+# ============ HEADLESS COMMANDS ============ 
+
+def output_path_for(source_path, mode, output_dir=None):
+    """Default output path: same name with the other extension, optionally in output_dir"""
+    output = Path(source_path).with_suffix('.docx' if mode == 'pdf' else '.pdf')
+    if output_dir:
+        output = Path(output_dir) / output.name
+    return str(output)
+
+
+def mode_for(path):
+    """Conversion mode for an input file, from its extension"""
+    extension = Path(path).suffix.lower()
+    if extension == '.pdf':
+        return 'pdf'
+    if extension == '.docx':
+        return 'docx'
+    raise PreflightError(f'Unsupported file type: {extension or "(none)"}')
+
+
+def run_batch_convert(inputs, profile, output_dir=None):
+    """Convert files without the GUI; returns the number of failures"""
+    converter = DocumentConverter(profile)
+    history = JobHistory()
+    failures = 0
+    
+    try:
+        for source_path in inputs:
+            try:
+                mode = mode_for(source_path)
+                meta = converter.preflight(source_path, mode)
+                output_path = output_path_for(source_path, mode, output_dir)
+                with history.track('batch', mode, source_path) as job:
+                    job['output'] = output_path
+                    job['engine'] = converter.convert_file(source_path, output_path, mode, meta)
+                print(f"{source_path} -> {output_path} ({job['engine']})")
+                if mode == 'pdf' and converter.size_report:
+                    print(f"  {format_size_report(converter.size_report)}")
+            except Exception as e:
+                failures += 1
+                print(f"{source_path}: FAILED - {e}")
+    finally:
+        converter.shutdown_worker_pool()
+    
+    return failures
+
+
+def run_queue_command(args):
+    """Handle `queue add|run|list`"""
+    job_queue = JobQueue()
+    
+    if args.queue_command == 'add':
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        for source_path in args.inputs:
+            try:
+                mode = mode_for(source_path)
+                DocumentConverter(args.profile).preflight(source_path, mode)
+            except PreflightError as e:
+                print(f"{source_path}: rejected - {e}")
+                continue
+            job_id = job_queue.enqueue(source_path, output_path_for(source_path, mode, args.output_dir), mode, args.profile)
+            print(f"{source_path}: queued as job #{job_id}")
+    
+    elif args.queue_command == 'run':
+        recovered = job_queue.recover()
+        if recovered:
+            print(f"Resuming {recovered} interrupted job(s)")
+        history = JobHistory()
+        
+        while True:
+            job_id = job_queue.claim_next()
+            if job_id is None:
+                due = job_queue.next_due_at()
+                if not args.wait or due is None:
+                    break
+                time.sleep(max(0, due - time.time()))
+                continue
+            
+            converter = DocumentConverter(job_queue.get(job_id)['profile'])
+            try:
+                job = job_queue.run_tracked(job_id, converter, history)
+            finally:
+                converter.shutdown_worker_pool()
+            print_jobs([job])
+    
+    else:
+        print_jobs(job_queue.list_jobs())
+
+
+def run_benchmark(corpus_dir, profiles, repeat=1):
+    """Convert every PDF/DOCX in corpus_dir with each profile and print timing per profile"""
+    inputs = sorted(
+        str(path) for path in Path(corpus_dir).rglob('*')
+        if path.suffix.lower() in ('.pdf', '.docx')
+    )
+    if not inputs:
+        print(f"No .pdf or .docx files found in {corpus_dir}")
+        return
+    
+    print(f"{len(inputs)} file(s), {repeat} run(s) per profile")
+    header = f"{'profile':<15}{'mode':<6}{'files':>6}{'pages':>7}{'wall s':>9}{'pages/s':>9}{'output MB':>11}{'failed':>8}"
+    print(header)
+    print('-' * len(header))
+    
+    for profile in profiles:
+        converter = DocumentConverter(profile)
+        totals = {}
+        with tempfile.TemporaryDirectory(prefix='bench_') as out_dir:
+            try:
+                for _ in range(repeat):
+                    for source_path in inputs:
+                        mode = mode_for(source_path)
+                        row = totals.setdefault(mode, {'files': 0, 'pages': 0, 'wall': 0.0, 'bytes': 0, 'failed': 0})
+                        output_path = output_path_for(source_path, mode, out_dir)
+                        start = time.perf_counter()
+                        try:
+                            converter.convert_file(source_path, output_path, mode, converter.preflight(source_path, mode))
+                        except Exception:
+                            row['failed'] += 1
+                            continue
+                        row['wall'] += time.perf_counter() - start
+                        row['files'] += 1
+                        row['pages'] += count_pages(source_path if mode == 'pdf' else output_path) or 0
+                        row['bytes'] += os.path.getsize(output_path)
+            finally:
+                converter.shutdown_worker_pool()
+        
+        for mode, row in sorted(totals.items()):
+            rate = row['pages'] / row['wall'] if row['wall'] else 0
+            print(
+                f"{profile:<15}{mode:<6}{row['files']:>6}{row['pages']:>7}{row['wall']:>9.2f}"
+                f"{rate:>9.1f}{row['bytes'] / (1024 * 1024):>11.2f}{row['failed']:>8}"
+            )
+
+
+def generate_bench_corpus(corpus_dir):
+    """Write a small reference corpus: text-only, scanned and mixed PDFs, a long report and a table DOCX"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    sentence = 'The quarterly figures were reviewed against the plan and the variance is explained below. '
+    
+    def text_page(pdf, number):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f'Chapter {number}', fontsize=16)
+        page.insert_textbox(fitz.Rect(72, 96, 540, 720), sentence * 24, fontsize=11)
+        return page
+    
+    with fitz.open() as pdf:
+        for number in range(1, 31):
+            text_page(pdf, number)
+        pdf.save(os.path.join(corpus_dir, 'text.pdf'))
+        
+        # Scanned pages: each text page rendered to an image, without a text layer
+        with fitz.open() as scanned:
+            for number in range(10):
+                pix = pdf[number].get_pixmap(dpi=150)
+                scanned.new_page(width=pdf[number].rect.width, height=pdf[number].rect.height).insert_image(
+                    pdf[number].rect, stream=pix.tobytes('jpeg', jpg_quality=80)
+                )
+            scanned.save(os.path.join(corpus_dir, 'scanned.pdf'))
+        
+        # Mixed pages: text, a photo-like image and a ruled table
+        photo = io.BytesIO()
+        Image.effect_mandelbrot((1200, 800), (-2, -1, 1, 1), 64).convert('RGB').save(photo, 'PNG')
+        with fitz.open() as mixed:
+            for number in range(1, 11):
+                page = mixed.new_page()
+                page.insert_text((72, 72), f'Section {number}', fontsize=16)
+                page.insert_textbox(fitz.Rect(72, 90, 540, 250), sentence * 6, fontsize=11)
+                page.insert_image(fitz.Rect(72, 260, 372, 460), stream=photo.getvalue())
+                for row in range(6):
+                    y = 480 + row * 20
+                    page.draw_line((72, y), (540, y))
+                    for col in range(4):
+                        page.insert_text((76 + col * 117, y + 14), f'R{row + 1} C{col + 1}', fontsize=10)
+                for col in range(5):
+                    page.draw_line((72 + col * 117, 480), (72 + col * 117, 580))
+            mixed.save(os.path.join(corpus_dir, 'mixed.pdf'))
+    
+    doc = Document()
+    for number in range(1, 41):
+        doc.add_heading(f'Section {number}', level=1)
+        for _ in range(6):
+            doc.add_paragraph(sentence * 4)
+        if number < 40:
+            doc.add_page_break()
+    doc.save(os.path.join(corpus_dir, 'report.docx'))
+    
+    generate_table_docx(os.path.join(corpus_dir, 'table.docx'), 500, 6)
+
+
+def generate_table_docx(docx_path, rows, cols):
+    """Write a DOCX holding one rows x cols table with a repeated header row; returns the number of vertical merges"""
+    doc = Document()
+    doc.add_paragraph(f'Generated table: {rows} rows x {cols} columns')
+    col_width = int(CONTENT_WIDTH * 20 / cols)
+    parts = [f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblW w:w="0" w:type="auto"/></w:tblPr><w:tblGrid>']
+    parts.append(f'<w:gridCol w:w="{col_width}"/>' * cols)
+    parts.append('</w:tblGrid>')
+    parts.append('<w:tr><w:trPr><w:tblHeader/></w:trPr>')
+    parts.extend(f'<w:tc><w:p><w:r><w:rPr><w:b/></w:rPr><w:t>Column {c + 1}</w:t></w:r></w:p></w:tc>' for c in range(cols))
+    parts.append('</w:tr>')
+    merges = 0
+    for r in range(rows):
+        parts.append('<w:tr>')
+        for c in range(cols):
+            if c == 0 and r % 10 == 0 and r + 1 < rows:
+                merge = '<w:tcPr><w:vMerge w:val="restart"/></w:tcPr>'
+                merges += 1
+            elif c == 0 and r % 10 == 1:
+                merge = '<w:tcPr><w:vMerge/></w:tcPr>'
+            else:
+                merge = ''
+            parts.append(f'<w:tc>{merge}<w:p><w:r><w:t>R{r + 1} C{c + 1} &amp; value {r * cols + c}</w:t></w:r></w:p></w:tc>')
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    doc.element.body.sectPr.addprevious(parse_xml(''.join(parts)))
+    doc.save(docx_path)
+    return merges
+
+
+def run_table_benchmark(rows, cols, profile):
+    """Time Word to PDF on a generated table and print cells per second"""
+    converter = DocumentConverter(profile)
+    with tempfile.TemporaryDirectory(prefix='bench_') as out_dir:
+        docx_path = os.path.join(out_dir, 'table.docx')
+        pdf_path = os.path.join(out_dir, 'table.pdf')
+        merges = generate_table_docx(docx_path, rows, cols)
+        
+        # Every generated merge must come out as exactly one SPAN, or the timing is not representative
+        story = []
+        for segment in converter.split_docx_segments(Document(docx_path)):
+            story.extend(converter.build_story(segment))
+        spans = sum(len(flowable._spanCmds) for flowable in story if isinstance(flowable, Table))
+        if spans != merges:
+            raise RuntimeError(f'Expected {merges} merged cells, the table builder produced {spans}')
+        
+        start = time.perf_counter()
+        try:
+            converter.convert_docx_to_pdf_preserve_formatting(docx_path, pdf_path, converter.preflight(docx_path, 'docx'))
+        finally:
+            converter.shutdown_worker_pool()
+        wall = time.perf_counter() - start
+        
+        cells = (rows + 1) * cols
+        print(f"{'rows':>7}{'cols':>6}{'cells':>9}{'merges':>8}{'pages':>7}{'wall s':>9}{'cells/s':>10}")
+        print(f"{rows:>7}{cols:>6}{cells:>9}{merges:>8}{count_pages(pdf_path) or 0:>7}{wall:>9.2f}{cells / wall if wall else 0:>10.0f}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Document Converter')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    stats_parser = subparsers.add_parser('stats', help='Show conversion metrics from the job history')
+    stats_parser.add_argument('--days', type=float, default=7, help='Time window in days (default: 7)')
+    
+    convert_parser = subparsers.add_parser('convert', help='Convert PDF/DOCX files without the GUI')
+    convert_parser.add_argument('inputs', nargs='+', help='PDF or DOCX files to convert')
+    convert_parser.add_argument('--profile', choices=list(CONVERSION_PROFILES), default=DEFAULT_PROFILE)
+    convert_parser.add_argument('--output-dir', help='Write outputs here instead of next to the inputs')
+    
+    queue_parser = subparsers.add_parser('queue', help='Durable job queue with crash resume')
+    queue_commands = queue_parser.add_subparsers(dest='queue_command', required=True)
+    queue_add = queue_commands.add_parser('add', help='Queue PDF/DOCX files for conversion')
+    queue_add.add_argument('inputs', nargs='+')
+    queue_add.add_argument('--profile', choices=list(CONVERSION_PROFILES), default=DEFAULT_PROFILE)
+    queue_add.add_argument('--output-dir', help='Write outputs here instead of next to the inputs')
+    queue_run = queue_commands.add_parser('run', help='Resume interrupted jobs and run everything that is due')
+    queue_run.add_argument('--wait', action='store_true', help='Keep running until no job is waiting for a retry')
+    queue_commands.add_parser('list', help='Show all jobs')
+    
+    bench_parser = subparsers.add_parser('bench', help='Time each profile on a corpus of PDF/DOCX files')
+    bench_parser.add_argument('corpus', help='Directory searched recursively for .pdf and .docx files')
+    bench_parser.add_argument('--profiles', nargs='+', choices=list(CONVERSION_PROFILES), default=list(CONVERSION_PROFILES))
+    bench_parser.add_argument('--repeat', type=int, default=1, help='Runs per profile (default: 1)')
+    bench_parser.add_argument('--generate', action='store_true', help='Write the reference corpus into the directory first')
+    
+    tables_parser = subparsers.add_parser('bench-tables', help='Time Word to PDF on a large generated table')
+    tables_parser.add_argument('--rows', type=int, default=2000, help='Body rows (default: 2000)')
+    tables_parser.add_argument('--cols', type=int, default=8, help='Columns (default: 8)')
+    tables_parser.add_argument('--profile', choices=list(CONVERSION_PROFILES), default=DEFAULT_PROFILE)
+    
+    args = parser.parse_args()
+    
+    if args.command == 'stats':
+        print_stats(args.days)
+        return
+    if args.command == 'convert':
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        sys.exit(1 if run_batch_convert(args.inputs, args.profile, args.output_dir) else 0)
+    if args.command == 'bench':
+        if args.generate:
+            generate_bench_corpus(args.corpus)
+        run_benchmark(args.corpus, args.profiles, args.repeat)
+        return
+    if args.command == 'bench-tables':
+        run_table_benchmark(args.rows, args.cols, args.profile)
+        return
+    if args.command == 'queue':
+        run_queue_command(args)
+        return
+    
     app = ConverterApp()
     app.run()
 